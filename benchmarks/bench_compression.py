@@ -0,0 +1,49 @@
+"""
+Benchmark batch compression throughput against the local compression API stand-ins.
+
+Run from the repository root:
+    python -m benchmarks.bench_compression --files 50 --file-size 262144
+"""
+import os
+import json
+import argparse
+import tempfile
+
+from benchmarks.fakes import configure_environment, offline_services
+from benchmarks.synthetic import make_binary_files
+from benchmarks.timing import timed
+
+
+def run(n_files=50, file_size=256 * 1024):
+    from src.file_compression.image_compression import compress_image
+    from src.file_compression.pdf_compression import compress_pdf
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp, offline_services() as services:
+        for name, compress, extension in (('compress_image', compress_image, 'png'),
+                                          ('compress_pdf', compress_pdf, 'pdf')):
+            paths = make_binary_files(os.path.join(tmp, extension), n_files, extension, file_size)
+            requests_before = services.http.requests
+            outputs, seconds = timed(lambda: [compress(file_path=path) for path in paths])
+            results.append({
+                'benchmark': name,
+                'files': n_files,
+                'file_size': file_size,
+                'compressed': sum(1 for output in outputs if output),
+                'http_requests': services.http.requests - requests_before,
+                'seconds': round(seconds, 4),
+                'files_per_s': round(n_files / seconds, 1),
+                'mb_per_s': round(n_files * file_size / seconds / 1e6, 2),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--file-size", type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        configure_environment(state_dir)
+        print(json.dumps(run(args.files, args.file_size), indent=2))
@@ -0,0 +1,60 @@
+"""
+Benchmark moving large media files to another filesystem: shutil.move versus the copy engine.
+
+The destination should be on a different filesystem than the system temp
+directory (e.g. a tmpfs such as /dev/shm, or an external disk), otherwise
+both sides are plain renames.
+
+Run from the repository root:
+    python -m benchmarks.bench_copy --dest /dev/shm --files 4 --file-mb 256
+"""
+import os
+import json
+import shutil
+import argparse
+import tempfile
+
+from benchmarks.synthetic import make_binary_files
+from benchmarks.timing import timed
+
+
+def _shutil_move_all(paths, dest_dir):
+    for path in paths:
+        shutil.move(path, dest_dir)
+
+
+def run(dest, n_files=4, file_mb=64):
+    from src.file_organizer import copy_engine
+    from src.file_organizer.move_plan import apply_move_plan, plan_moves
+
+    file_size = file_mb * 1024 * 1024
+    results = []
+    for engine in (False, True):
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory(dir=dest) as dest_root:
+            source_dir = os.path.join(tmp, "data")
+            paths = make_binary_files(source_dir, n_files, "mkv", file_size)
+            if engine:
+                # Every file counts as large, so all of them go through the engine.
+                _, seconds = timed(apply_move_plan, plan_moves(source_dir, dest_root), large_file_bytes=0)
+            else:
+                os.makedirs(os.path.join(dest_root, "Media"))
+                _, seconds = timed(_shutil_move_all, paths, os.path.join(dest_root, "Media"))
+            results.append({
+                'benchmark': 'cross_device_move',
+                'engine': 'copy_engine' if engine else 'shutil.move',
+                'cross_device': not copy_engine.same_filesystem(tmp, dest_root),
+                'files': n_files,
+                'file_mb': file_mb,
+                'seconds': round(seconds, 4),
+                'mb_per_s': round(n_files * file_mb / seconds, 1),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dest", required=True, help="Directory on another filesystem")
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--file-mb", type=int, default=64)
+    args = parser.parse_args()
+    print(json.dumps(run(args.dest, args.files, args.file_mb), indent=2))
@@ -0,0 +1,60 @@
+"""
+Benchmark LLM call tail latency with and without hedging.
+
+The local backend answers in ``--latency`` seconds, but ``--stall-probability``
+of its calls stall for ``--stall`` more seconds. With hedging, a call still
+running at its stage's p95 is duplicated and the first answer wins.
+
+Run from the repository root:
+    python -m benchmarks.bench_llm_tail --calls 300 --latency 0.02 --stall 0.5
+"""
+import json
+import argparse
+import tempfile
+
+from benchmarks.fakes import configure_environment
+from benchmarks.timing import timed
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(calls=300, latency_s=0.02, stall_probability=0.03, stall_s=0.5):
+    from src.llm_engine.backends import LocalRuleBackend
+    from src.llm_engine.gemini_agent import Agent
+    from src.llm_engine import resilience
+
+    results = []
+    for hedge in (False, True):
+        backend = LocalRuleBackend(latency_s=latency_s, stall_probability=stall_probability, stall_s=stall_s)
+        stage = f"bench_tail_{'hedged' if hedge else 'plain'}"
+        resilience.STAGE_POLICIES[stage] = resilience.DEFAULT_POLICY._replace(hedge=hedge)
+        agent = Agent(system_prompt="Classify the query", stage=stage, backend=backend)
+
+        latencies = [timed(agent.perform_action, "Organize my folder")[1] for _ in range(calls)]
+        results.append({
+            'benchmark': 'llm_tail',
+            'hedge': hedge,
+            'calls': calls,
+            'backend_calls': backend.calls,
+            'p50_s': round(percentile(latencies, 0.50), 4),
+            'p95_s': round(percentile(latencies, 0.95), 4),
+            'p99_s': round(percentile(latencies, 0.99), 4),
+            'max_s': round(max(latencies), 4),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--stall-probability", type=float, default=0.03)
+    parser.add_argument("--stall", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        configure_environment(state_dir)
+        print(json.dumps(run(args.calls, args.latency, args.stall_probability, args.stall), indent=2))
@@ -0,0 +1,123 @@
+"""
+Benchmark running one instruction on many folders: ``scheduler()`` per folder versus ``scheduler_many()``.
+
+The per-folder loop plans every folder with the LLM; scheduler_many plans
+once and runs the plan on the folders in a process pool. Both plans are
+measured: organize and compress, and running each folder's to-do file, where
+every folder schedules a 9:30 stock alert for its own symbol. For the to-do
+plan, the persisted alert jobs and saved cursors are counted, so lost writes
+show up as fewer than one per folder.
+
+Run from the repository root:
+    python -m benchmarks.bench_many_folders --folders 100 --files 200 --llm-latency 0.5
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+from benchmarks.fakes import configure_environment, offline_services
+from benchmarks.synthetic import make_synthetic_folder
+from benchmarks.timing import timed
+
+
+DEFAULT_PLAN = ("move_files_to_categories", "compress_pdf")
+TODO_PLAN = ("process_todo_file",)
+PLANS = {"organize_compress": DEFAULT_PLAN, "todo": TODO_PLAN}
+
+
+def _alert_symbol(mode, i):
+    # Distinct per mode, since both modes schedule into the same job store.
+    return f"{''.join(word[0] for word in mode.split('_')).upper()}{i:04d}"
+
+
+def _make_folders(root, mode, n_folders, n_files, file_size, plan):
+    folders = []
+    for i in range(n_folders):
+        folder = os.path.join(root, f"customer_{i:04d}", "data")
+        make_synthetic_folder(folder, n_files, file_size=file_size, seed=i)
+        if "process_todo_file" in plan:
+            with open(os.path.join(folder, "to_do.txt"), 'w') as f:
+                f.write(f'Remind me to "review customer {i}" via email\n')
+                f.write(f'Share the stock price for {_alert_symbol(mode, i)} every day at 9:30 AM via email with me\n')
+        folders.append(folder)
+    return folders
+
+
+def _count_todo_writes(mode, folders):
+    from src.execute_to_do_tasks.job_scheduler import get_scheduler, shutdown_scheduler
+    from src.execute_to_do_tasks.todo_parser import TODO_STATE_PATH
+
+    symbols = {_alert_symbol(mode, i) for i in range(len(folders))}
+    alerts = sum(job.kwargs.get('symbol') in symbols for job in get_scheduler().get_jobs())
+    # The job store lives in the caller's temporary state directory.
+    shutdown_scheduler()
+    with open(TODO_STATE_PATH) as f:
+        cursors = json.load(f)
+    saved = sum(os.path.abspath(os.path.join(folder, "to_do.txt")) in cursors for folder in folders)
+    return alerts, saved
+
+
+def _scheduler_per_folder(query, folders):
+    from src.llm_engine.scheduler import scheduler
+    for folder in folders:
+        scheduler(query, folder)
+
+
+def run(n_folders=50, n_files=200, file_size=1024, llm_latency_s=0.0, max_workers=None, plans=PLANS.values()):
+    results = []
+    for plan in plans:
+        results.extend(_run_plan(n_folders, n_files, file_size, llm_latency_s, max_workers, tuple(plan)))
+    return results
+
+
+def _run_plan(n_folders, n_files, file_size, llm_latency_s, max_workers, plan):
+    from src.llm_engine.scheduler import scheduler_many
+
+    query = "Run my to-do files" if plan == TODO_PLAN else "Organize my folder and compress the PDFs"
+    results = []
+    for mode in ("per_folder", "plan_once"):
+        with tempfile.TemporaryDirectory() as tmp, offline_services(plan=plan, llm_latency_s=llm_latency_s) as services:
+            folders = _make_folders(os.path.join(tmp, mode), mode, n_folders, n_files, file_size, plan)
+            if mode == "per_folder":
+                _, seconds = timed(_scheduler_per_folder, query, folders)
+                failed = 0
+            else:
+                summary, seconds = timed(scheduler_many, query, os.path.join(tmp, mode, "customer_*", "data"),
+                                         max_workers=max_workers)
+                failed = summary['failed']
+            result = {
+                'benchmark': 'many_folders',
+                'mode': mode,
+                'folders': n_folders,
+                'files': n_files,
+                'plan': list(plan),
+                'llm_latency_s': llm_latency_s,
+                'llm_calls': services.llm.calls,
+                'failed': failed,
+                'seconds': round(seconds, 4),
+                'folders_per_s': round(n_folders / seconds, 2),
+            }
+            if plan == TODO_PLAN:
+                result['alerts_scheduled'], result['cursors_saved'] = _count_todo_writes(mode, folders)
+                if result['alerts_scheduled'] != n_folders or result['cursors_saved'] != n_folders:
+                    print(f"WARNING: {mode} lost to-do writes: {result}", file=sys.stderr)
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--folders", type=int, default=50)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-size", type=int, default=1024)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per LLM call")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--plans", default=",".join(PLANS), help=f"Comma separated subset of {tuple(PLANS)}")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        configure_environment(state_dir)
+        print(json.dumps(run(args.folders, args.files, args.file_size, args.llm_latency, args.workers,
+                             [PLANS[name] for name in args.plans.split(",")]), indent=2))
@@ -0,0 +1,42 @@
+"""
+Benchmark ``move_files_to_categories`` throughput on synthetic folders.
+
+Run from the repository root:
+    python -m benchmarks.bench_organizer --sizes 1000,10000,100000
+"""
+import os
+import json
+import argparse
+import tempfile
+
+from benchmarks.synthetic import make_synthetic_folder
+from benchmarks.timing import timed
+
+
+def run(sizes=(1_000, 10_000), file_size=0):
+    from src.file_organizer.organize_files import move_files_to_categories
+
+    results = []
+    for n_files in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            source_dir = os.path.join(tmp, "data")
+            make_synthetic_folder(source_dir, n_files, file_size=file_size)
+            dest_map, seconds = timed(move_files_to_categories, source_dir=source_dir,
+                                      destination_root=os.path.join(tmp, "organized"))
+            results.append({
+                'benchmark': 'organizer',
+                'files': n_files,
+                'file_size': file_size,
+                'moved': len(dest_map),
+                'seconds': round(seconds, 4),
+                'files_per_s': round(n_files / seconds, 1),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000", help="Comma separated file counts, up to 1000000")
+    parser.add_argument("--file-size", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(run([int(n) for n in args.sizes.split(",")], args.file_size), indent=2))
@@ -0,0 +1,68 @@
+"""
+Benchmark end-to-end ``scheduler()`` latency with the local LLM backend and service stand-ins.
+
+Each run plans with the local rule backend, optionally simulating the latency
+of the default and of the fast model, then organizes a fresh synthetic folder
+and compresses a PDF and a PNG from it.
+
+Run from the repository root:
+    python -m benchmarks.bench_scheduler --files 1000 --llm-latency 0.8 --fast-llm-latency 0.2
+"""
+import os
+import json
+import argparse
+import tempfile
+
+from benchmarks.fakes import configure_environment, offline_services
+from benchmarks.synthetic import make_synthetic_folder
+from benchmarks.timing import timed
+
+
+DEFAULT_PLAN = ("move_files_to_categories", "compress_pdf", "compress_image")
+
+
+def run(n_files=1_000, file_size=4096, llm_latency_s=0.0, repeats=3, plan=DEFAULT_PLAN, fast_llm_latency_s=None):
+    from src.llm_engine.backends import DEFAULT_MODEL, FAST_MODEL
+    from src.llm_engine.scheduler import scheduler
+
+    if fast_llm_latency_s is None:
+        fast_llm_latency_s = llm_latency_s
+    latency_by_model = {DEFAULT_MODEL: llm_latency_s, FAST_MODEL: fast_llm_latency_s}
+
+    latencies = []
+    with tempfile.TemporaryDirectory() as tmp, offline_services(plan=plan, llm_latency_s=latency_by_model) as services:
+        for repeat in range(repeats):
+            folder_path = os.path.join(tmp, f"run_{repeat}", "data")
+            make_synthetic_folder(folder_path, n_files, file_size=file_size, seed=repeat)
+            response, seconds = timed(scheduler, "Organize my folder and compress the files", folder_path)
+            latencies.append(seconds)
+
+    return [{
+        'benchmark': 'scheduler_end_to_end',
+        'files': n_files,
+        'file_size': file_size,
+        'plan': list(plan),
+        'llm_latency_s': llm_latency_s,
+        'fast_llm_latency_s': fast_llm_latency_s,
+        'llm_calls_per_run': services.llm.calls // repeats,
+        'llm_calls_by_model': {model: calls // repeats for model, calls in services.llm.calls_by_model.items()},
+        'repeats': repeats,
+        'min_s': round(min(latencies), 4),
+        'mean_s': round(sum(latencies) / len(latencies), 4),
+        'max_s': round(max(latencies), 4),
+    }]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=1_000)
+    parser.add_argument("--file-size", type=int, default=4096)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per default-model call")
+    parser.add_argument("--fast-llm-latency", type=float, default=None, help="Simulated seconds per fast-model call")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        configure_environment(state_dir)
+        print(json.dumps(run(args.files, args.file_size, args.llm_latency, args.repeats,
+                             fast_llm_latency_s=args.fast_llm_latency), indent=2))
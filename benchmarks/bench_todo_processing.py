@@ -0,0 +1,117 @@
+"""
+Benchmark to-do processing on synthetic to-do files.
+
+Compares the previous parser (three uncompiled ``re.match`` calls per line,
+whole file re-read on every run) with the streaming parser, for a full first
+run and for an incremental run after a few lines are appended. Then runs
+``process_todo_file`` end to end against the local SMTP sink, quote
+provider and job store.
+
+Run from the repository root:
+    python -m benchmarks.bench_todo_processing --lines 100000
+"""
+import os
+import re
+import json
+import argparse
+import tempfile
+
+from benchmarks.synthetic import write_todo_lines
+from benchmarks.timing import timed
+
+
+LEGACY_PATTERNS = {
+    'email_reminder': r'Remind me to (.*?) via email',
+    'calendar_invite': r'Add a calendar invite for (.*?) date at (.*?) and share it with "(.*?)"',
+    'stock_alert': r'Share the stock price for (.*?) every day at (.*?) via email with me'
+}
+
+
+def legacy_parse(file_path):
+    commands = []
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            for cmd_type, pattern in LEGACY_PATTERNS.items():
+                match = re.match(pattern, line)
+                if match:
+                    commands.append({'type': cmd_type, 'params': match.groups()})
+                    break
+    return len(commands)
+
+
+def streaming_parse(file_path, state_path):
+    from src.execute_to_do_tasks.todo_parser import load_todo_state, save_todo_state, stream_todo_commands
+
+    state = load_todo_state(file_path, state_path)
+    count = sum(1 for _ in stream_todo_commands(file_path, state))
+    save_todo_state(file_path, state, state_path)
+    return count
+
+
+def run_parser(lines=100_000, appended=100):
+    with tempfile.TemporaryDirectory() as tmp:
+        todo_path = os.path.join(tmp, "to_do.txt")
+        state_path = os.path.join(tmp, "todo_state.json")
+        write_todo_lines(todo_path, 0, lines)
+
+        legacy_count, legacy_full = timed(legacy_parse, todo_path)
+        stream_count, stream_full = timed(streaming_parse, todo_path, state_path)
+        assert legacy_count == stream_count
+
+        write_todo_lines(todo_path, lines, appended)
+        _, legacy_rerun = timed(legacy_parse, todo_path)
+        rerun_count, stream_rerun = timed(streaming_parse, todo_path, state_path)
+
+    return {
+        'benchmark': 'todo_parser',
+        'lines': lines,
+        'appended_lines': appended,
+        'commands_first_run': stream_count,
+        'commands_incremental_run': rerun_count,
+        'legacy_full_s': round(legacy_full, 4),
+        'streaming_full_s': round(stream_full, 4),
+        'legacy_rerun_s': round(legacy_rerun, 4),
+        'streaming_rerun_s': round(stream_rerun, 4),
+    }
+
+
+def run_end_to_end(lines=2_000):
+    from benchmarks.fakes import offline_services
+    from src.execute_to_do_tasks import job_scheduler, run_to_do_tasks
+
+    with tempfile.TemporaryDirectory() as tmp, offline_services() as services:
+        write_todo_lines(os.path.join(tmp, "to_do.txt"), 0, lines)
+        try:
+            _, seconds = timed(run_to_do_tasks.process_todo_file, tmp)
+            _, rerun_seconds = timed(run_to_do_tasks.process_todo_file, tmp)
+        finally:
+            job_scheduler.shutdown_scheduler()
+
+        return {
+            'benchmark': 'todo_process_file',
+            'lines': lines,
+            'seconds': round(seconds, 4),
+            'lines_per_s': round(lines / seconds, 1),
+            'rerun_seconds': round(rerun_seconds, 4),
+            'emails': len(services.smtp.messages),
+            'smtp_sessions': services.smtp.sessions,
+        }
+
+
+def run(lines=100_000, appended=100, end_to_end_lines=2_000):
+    return [run_parser(lines, appended), run_end_to_end(end_to_end_lines)]
+
+
+if __name__ == "__main__":
+    from benchmarks.fakes import configure_environment
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--appended", type=int, default=100)
+    parser.add_argument("--end-to-end-lines", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        configure_environment(state_dir)
+        print(json.dumps(run(args.lines, args.appended, args.end_to_end_lines), indent=2))
@@ -0,0 +1,54 @@
+"""
+Compare two run_benchmarks JSON reports and flag timings that regressed.
+
+Run from the repository root:
+    python -m benchmarks.compare baseline.json current.json --threshold 0.10
+"""
+import sys
+import json
+import argparse
+
+
+# Fields that identify a result: its size and the variant measured (hedged or
+# not, per-folder or plan-once, copy engine or shutil.move). Fields ending in
+# "_s" or "seconds" are timings (lower is better), fields ending in "_per_s" are
+# throughputs (higher is better).
+KEY_FIELDS = ("benchmark", "files", "lines", "appended_lines", "file_size", "file_mb", "folders", "calls",
+              "llm_latency_s", "fast_llm_latency_s", "hedge", "mode", "plan", "engine", "cross_device")
+
+
+def result_key(result):
+    return tuple((field, tuple(value) if isinstance(value, list) else value)
+                 for field, value in ((field, result.get(field)) for field in KEY_FIELDS if field in result))
+
+
+def compare(baseline, current, threshold):
+    baseline_results = {result_key(r): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = baseline_results.get(result_key(result))
+        if before is None:
+            continue
+        for field, value in result.items():
+            if not field.endswith(("_s", "seconds")) or field in KEY_FIELDS or not before.get(field):
+                continue
+            change = (value - before[field]) / before[field]
+            if field.endswith("_per_s"):
+                change = -change
+            flag = "REGRESSION" if change > threshold else ""
+            print(f"{result['benchmark']:<24} {field:<20} {before[field]:>10} -> {value:>10} {change:+7.1%} slower {flag}")
+            if flag:
+                regressions.append((result['benchmark'], field, change))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f, open(args.current) as g:
+        regressions = compare(json.load(f), json.load(g), args.threshold)
+    sys.exit(1 if regressions else 0)
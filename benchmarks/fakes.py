@@ -0,0 +1,232 @@
+"""
+Deterministic local stand-ins for every external service the agent talks to.
+
+- LocalRuleBackend (src/llm_engine/backends.py) answers every ``Agent``
+- CompressionStandIn is a local HTTP server speaking enough of the TinyPNG
+  and iLovePDF APIs for the compressors
+- SMTPSink replaces ``smtplib.SMTP``/``SMTP_SSL`` and records every message
+- FakeQuoteProvider replaces the yfinance quote download
+
+``offline_services()`` installs all of them at once.
+"""
+import os
+import json
+import time
+import hashlib
+import itertools
+import threading
+import contextlib
+import urllib.request
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def configure_environment(state_dir):
+    """Point every persisted state file at ``state_dir``. Call before importing ``src``."""
+    os.environ["LLM_BACKEND"] = "local"
+    os.environ["TODO_STATE_PATH"] = os.path.join(state_dir, "todo_state.json")
+    os.environ["SCHEDULER_DB_PATH"] = os.path.join(state_dir, "jobs.sqlite")
+
+
+#---------------------
+# Compression APIs
+#---------------------
+
+class _CompressionHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body, content_type="application/octet-stream"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        compressed = data[:len(data) // 2]
+        self.server.requests += 1
+        if self.path == "/shrink":
+            output_id = str(next(self.server.ids))
+            self.server.outputs[output_id] = compressed
+            body = json.dumps({
+                'input': {'size': len(data)},
+                'output': {'size': len(compressed), 'url': f"{self.server.base_url}/output/{output_id}"}
+            }).encode()
+            self._reply(201, body, "application/json")
+        elif self.path == "/ilovepdf/compress":
+            self._reply(200, compressed)
+        else:
+            self._reply(404, b"")
+
+    def do_GET(self):
+        output = self.server.outputs.pop(self.path.rsplit("/", 1)[-1], None)
+        self.server.requests += 1
+        if output is None:
+            self._reply(404, b"")
+        else:
+            self._reply(200, output)
+
+
+class CompressionStandIn:
+    """Local HTTP server standing in for TinyPNG (/shrink) and iLovePDF (/ilovepdf/compress)."""
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _CompressionHandler)
+        self.server.daemon_threads = True
+        self.server.outputs = {}
+        self.server.ids = itertools.count()
+        self.server.requests = 0
+        self.base_url = self.server.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def requests(self):
+        return self.server.requests
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_fake_compress(base_url):
+    """Build a drop-in for ``pylovepdf.tools.compress.Compress`` that talks to the stand-in."""
+
+    class FakeCompress:
+        def __init__(self, public_key, verify_ssl=True, proxies=False):
+            self.files = []
+            self.output_folder = None
+            self.results = {}
+
+        def add_file(self, file_path):
+            self.files.append(file_path)
+
+        def set_output_folder(self, output_folder):
+            self.output_folder = output_folder
+
+        def execute(self):
+            for file_path in self.files:
+                with open(file_path, 'rb') as f:
+                    request = urllib.request.Request(f"{base_url}/ilovepdf/compress", data=f.read(), method="POST")
+                with urllib.request.urlopen(request) as response:
+                    self.results[file_path] = response.read()
+
+        def download(self):
+            os.makedirs(self.output_folder, exist_ok=True)
+            for file_path, data in self.results.items():
+                with open(os.path.join(self.output_folder, os.path.basename(file_path)), 'wb') as f:
+                    f.write(data)
+
+        def delete_current_task(self):
+            self.results = {}
+
+    return FakeCompress
+
+
+#---------------------
+# Email
+#---------------------
+
+class SMTPSink:
+    """Drop-in for ``smtplib.SMTP``/``SMTP_SSL`` that records messages instead of sending them."""
+
+    sessions = 0
+    messages = []
+    _lock = threading.Lock()
+
+    def __init__(self, host="", port=0, *args, **kwargs):
+        with SMTPSink._lock:
+            SMTPSink.sessions += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.quit()
+
+    def starttls(self, *args, **kwargs):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def send_message(self, msg, from_addr=None, to_addrs=None):
+        with SMTPSink._lock:
+            SMTPSink.messages.append(msg.as_string())
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        with SMTPSink._lock:
+            SMTPSink.messages.append(msg)
+
+    def quit(self):
+        pass
+
+    @classmethod
+    def reset(cls):
+        cls.sessions = 0
+        cls.messages = []
+
+
+#---------------------
+# Stock quotes
+#---------------------
+
+class FakeQuoteProvider:
+    """Deterministic quotes derived from the symbol, counting provider calls."""
+
+    def __init__(self, latency_s=0.0):
+        self.latency_s = latency_s
+        self.calls = 0
+
+    def __call__(self, symbols):
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        quotes = {}
+        for symbol in symbols:
+            digest = int(hashlib.sha1(symbol.encode()).hexdigest()[:8], 16)
+            quotes[symbol] = {'price': round(10 + digest % 90000 / 100, 2),
+                              'change_percent': (digest % 1000 - 500) / 100}
+        return quotes
+
+
+@contextlib.contextmanager
+def offline_services(plan=None, llm_latency_s=0.0, quote_latency_s=0.0):
+    """
+    Install every local stand-in for the duration of the block.
+
+    ``plan`` fixes the function names the LLM plans, by default they follow
+    from the query. ``llm_latency_s`` is the simulated latency of every LLM
+    call, or a {model: seconds} mapping.
+
+    Example call:
+    with offline_services(plan=["move_files_to_categories"]) as services:
+        scheduler("Organize my folder", folder_path)
+
+    Yields:
+        SimpleNamespace: ``llm``, ``http``, ``smtp`` and ``quotes`` stand-ins
+    """
+    from types import SimpleNamespace
+    from src.llm_engine.backends import LocalRuleBackend, set_backend
+    from src.file_compression import image_compression, pdf_compression
+    from src.execute_to_do_tasks import stock_quotes
+
+    llm = LocalRuleBackend(plan, latency_s=llm_latency_s)
+    quotes = FakeQuoteProvider(latency_s=quote_latency_s)
+    SMTPSink.reset()
+
+    with CompressionStandIn() as http, contextlib.ExitStack() as stack:
+        stack.callback(set_backend, set_backend(llm))
+        stack.enter_context(mock.patch.object(image_compression, "TINIFY_SHRINK_URL", f"{http.base_url}/shrink"))
+        stack.enter_context(mock.patch.object(pdf_compression, "Compress", make_fake_compress(http.base_url)))
+        stack.enter_context(mock.patch("smtplib.SMTP", SMTPSink))
+        stack.enter_context(mock.patch("smtplib.SMTP_SSL", SMTPSink))
+        stack.enter_context(mock.patch.object(stock_quotes.quote_service, "provider", quotes))
+        stock_quotes.quote_service.clear()
+        yield SimpleNamespace(llm=llm, http=http, smtp=SMTPSink, quotes=quotes)
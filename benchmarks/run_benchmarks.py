@@ -0,0 +1,82 @@
+"""
+Run the offline benchmark suite and emit the results as JSON.
+
+Every external service is replaced by a local stand-in (see benchmarks/fakes.py),
+so the suite runs without network access or API keys.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --only organizer,todo --organizer-sizes 1000,100000
+"""
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+from benchmarks.fakes import configure_environment
+
+
+BENCHMARKS = ("scheduler", "organizer", "compression", "todo", "llm_tail", "many_folders")
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args):
+    from benchmarks import (bench_compression, bench_llm_tail, bench_many_folders, bench_organizer,
+                            bench_scheduler, bench_todo_processing)
+
+    suite = {
+        "scheduler": lambda: bench_scheduler.run(args.scheduler_files, llm_latency_s=args.llm_latency,
+                                          fast_llm_latency_s=args.fast_llm_latency),
+        "organizer": lambda: bench_organizer.run([int(n) for n in args.organizer_sizes.split(",")]),
+        "compression": lambda: bench_compression.run(args.compression_files),
+        "todo": lambda: bench_todo_processing.run(args.todo_lines),
+        "llm_tail": lambda: bench_llm_tail.run(args.llm_tail_calls),
+        "many_folders": lambda: bench_many_folders.run(args.many_folders, llm_latency_s=args.llm_latency),
+    }
+
+    results = []
+    for name in args.only.split(","):
+        print(f"Running {name} benchmark...", file=sys.stderr)
+        results.extend(suite[name]())
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help=f"Comma separated subset of {BENCHMARKS}")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--scheduler-files", type=int, default=1_000)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per default-model call")
+    parser.add_argument("--fast-llm-latency", type=float, default=None, help="Simulated seconds per fast-model call")
+    parser.add_argument("--organizer-sizes", default="1000,10000", help="Comma separated file counts, up to 1000000")
+    parser.add_argument("--compression-files", type=int, default=50)
+    parser.add_argument("--todo-lines", type=int, default=100_000)
+    parser.add_argument("--llm-tail-calls", type=int, default=300)
+    parser.add_argument("--many-folders", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        configure_environment(state_dir)
+        report = {
+            'commit': git_commit(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': run_suite(args),
+        }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
@@ -0,0 +1,72 @@
+"""
+Synthetic inputs for the benchmarks: folders of mixed file types and to-do files.
+"""
+import os
+import random
+
+
+# Weighted roughly like a downloads folder, including extensions without a category.
+EXTENSION_WEIGHTS = {
+    'pdf': 12, 'docx': 6, 'txt': 8, 'md': 3,
+    'png': 12, 'jpg': 12, 'gif': 2, 'svg': 1,
+    'py': 4, 'js': 3, 'html': 2, 'json': 4, 'csv': 4, 'xlsx': 3,
+    'zip': 3, 'tar': 1, 'mp3': 3, 'mp4': 3, 'mkv': 1,
+    'exe': 1, 'dat': 2, 'bak': 1,
+}
+
+TODO_LINE_TEMPLATES = [
+    'Remind me to "submit report {i}" via email',
+    'Add a calendar invite for "Sync {i}" on 12/03/2025 date at 5:15 PM and share it with "user{i}@example.com"',
+    'Share the stock price for TICK{i} every day at 9:30 AM via email with me',
+    'Buy groceries for week {i}',
+]
+
+
+def make_synthetic_folder(root, n_files, file_size=0, seed=0):
+    """
+    Create ``n_files`` files with mixed extensions directly inside ``root``.
+
+    Example call:
+    make_synthetic_folder("/tmp/bench/data", 10_000, file_size=1024)
+
+    Args:
+        root (str): Folder to fill, created if missing
+        n_files (int): Number of files, 1k to 1M in the benchmarks
+        file_size (int, optional): Bytes per file, 0 creates empty files
+        seed (int, optional): Seed of the extension mix
+
+    Returns:
+        dict: Count of files per extension
+    """
+    os.makedirs(root, exist_ok=True)
+    rng = random.Random(seed)
+    extensions = rng.choices(list(EXTENSION_WEIGHTS), weights=list(EXTENSION_WEIGHTS.values()), k=n_files)
+    payload = rng.randbytes(file_size) if file_size else b""
+
+    counts = {}
+    for i, ext in enumerate(extensions):
+        with open(os.path.join(root, f"file_{i:07d}.{ext}"), 'wb') as f:
+            f.write(payload)
+        counts[ext] = counts.get(ext, 0) + 1
+    return counts
+
+
+def make_binary_files(root, n_files, extension, file_size, seed=0):
+    """Create ``n_files`` files of ``file_size`` random bytes with one extension, return their paths."""
+    os.makedirs(root, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(n_files):
+        path = os.path.join(root, f"{extension}_{i:05d}.{extension}")
+        with open(path, 'wb') as f:
+            f.write(rng.randbytes(file_size))
+        paths.append(path)
+    return paths
+
+
+def write_todo_lines(file_path, start, count, templates=TODO_LINE_TEMPLATES, seed=0):
+    """Append ``count`` synthetic to-do lines, numbered from ``start``."""
+    rng = random.Random(seed + start)
+    with open(file_path, 'a') as f:
+        for i in range(start, start + count):
+            f.write(rng.choice(templates).format(i=i) + "\n")
@@ -0,0 +1,8 @@
+import time
+
+
+def timed(fn, *args, **kwargs):
+    """Run ``fn`` once and return ``(result, seconds)``."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
@@ -1,14 +1,21 @@
 import os
+import glob
+import argparse
+import contextlib
 import logging
 
 import traceback
 from tqdm import tqdm
+from src.execute_to_do_tasks.job_scheduler import format_job_metrics, get_scheduler
 from src.llm_engine.gemini_agent import Agent
-from src.llm_engine.scheduler import scheduler
+from src.llm_engine.resilience import LLMError
+from src.llm_engine.scheduler import resolve_folders, scheduler
 from src.file_organizer.validate_and_scan_folder import validate_folder_and_files
+from src.observability.log_config import configure_logging
+from src.observability.profiling import profiled
+from src.observability.tracing import span, start_tracing, stop_tracing
 
 __name__ = "__run_agentic_framework__"
-logging.basicConfig(level = logging.INFO)
 logger = logging.getLogger(__name__)
 
 def valid_task_identifier(user_query):
@@ -25,19 +32,86 @@ def valid_task_identifier(user_query):
                                 
                     """
 
-    task_identifier_agent = Agent(system_prompt=system_prompt)
+    task_identifier_agent = Agent(system_prompt=system_prompt, stage="task_identifier")
 
     response = task_identifier_agent.perform_action(user_query=user_query)
 
     return response
 
 
+def run_session(show_job_metrics=False):
 
+    try:
+
+        while int(input()):
+            #print("Please enter your query/job that you want me to do:\n")
+            user_query = input("Please enter your query/job that you want me to do:\n")
+            with span("query", cat="session"):
+                try:
+                    with span("validation.task", cat="validation"):
+                        task = valid_task_identifier(user_query)
+                except LLMError as e:
+                    logger.info(f"Sorry! I could not reach the language model, please try again: {e}")
+                    continue
+                if not int(task):
+                    logger.info("Sorry! I am unable to understand your query!")
+                    logger.info("Please be specific about your use-case and mention any task that I can align with")
+                    continue 
+
+                else:
+                    logger.info("The tasks are clear. Now let's start solving them")
+                    logger.info("Enter the folder path you want to manage, or a glob pattern to run on many folders:\n")
+                    folder_path = input()
+
+                    with span("validation.folder", cat="validation"):
+                        if glob.has_magic(folder_path) and not os.path.isdir(folder_path):
+                            is_valid = bool(resolve_folders(folder_path))
+                        else:
+                            is_valid = validate_folder_and_files(folder_path)
+                    
+                    if is_valid: 
+                        try:
+                            with span("scheduler", cat="session"):
+                                response = scheduler(user_query, folder_path)
+                        except LLMError as e:
+                            response = f"Sorry! I could not plan your job, the language model did not answer: {e}"
+                        logger.info(response)
+                        if show_job_metrics:
+                            logger.info(f"Scheduled jobs:\n{format_job_metrics()}")
+                    else:
+                        logger.info(ValueError("The folder path doesn't exist or the folder does not contain any file to manage."))
+            
+
+    
+    except Exception as e:
+        logger.info(f"There is some issue in running your process: {traceback.format_exc()}")
+
+    if show_job_metrics:
+        logger.info(f"Scheduled jobs:\n{format_job_metrics()}")
 
 
 if __name__ == "__run_agentic_framework__":
 
+    parser = argparse.ArgumentParser(description="Run the AI assistant")
+    parser.add_argument("--profile", nargs="?", const="profile_report.txt", metavar="REPORT",
+                        help="Run under cProfile and tracemalloc and write a hot-function and allocation report")
+    parser.add_argument("--trace", metavar="TRACE_FILE",
+                        help="Write timing spans of the run as a Chrome trace JSON file")
+    parser.add_argument("--job-metrics", action="store_true",
+                        help="Log the lag and run duration of the scheduled jobs after every query and at exit")
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.trace:
+        start_tracing(args.trace)
+
     logger.info("Starting agentic Framework")
+
+    # Stock alerts persisted by earlier sessions only fire while the shared scheduler runs.
+    try:
+        get_scheduler()
+    except Exception as e:
+        logger.info(f"Could not start the job scheduler, scheduled stock alerts will not run: {e}")
     
     logger.info("""
         ╔═══════╗
@@ -58,33 +132,10 @@ if __name__ == "__run_agentic_framework__":
         
     """)
 
-    try:
-
-        while int(input()):
-            #print("Please enter your query/job that you want me to do:\n")
-            user_query = input("Please enter your query/job that you want me to do:\n")
-            task = valid_task_identifier(user_query)
-            if not int(task):
-                logger.info("Sorry! I am unable to understand your query!")
-                logger.info("Please be specific about your use-case and mention any task that I can align with")
-                continue 
-
-            else:
-                logger.info("The tasks are clear. Now let's start solving them")
-                logger.info("Enter the folder path you want to manage:\n")
-                folder_path = input()
-
-                is_valid = validate_folder_and_files(folder_path)
-                
-                if is_valid: 
-                    response = scheduler(user_query, folder_path)
-                    logger.info(response)
-                else:
-                    logger.info(ValueError("The folder path doesn't exist or the folder does not contain any file to manage."))
-            
-
-    
-    except Exception as e:
-        logger.info(f"There is some issue in running your process: {str(traceback.format_exc(e))}")
+    with profiled(args.profile) if args.profile else contextlib.nullcontext():
+        run_session(show_job_metrics=args.job_metrics)
 
-        
+    if args.trace:
+        logger.info(f"Trace written to {stop_tracing()}")
+    if args.profile:
+        logger.info(f"Profile report written to {args.profile}")
@@ -0,0 +1,215 @@
+import io
+import os
+import re
+import hashlib
+import smtplib
+import logging
+import datetime
+import functools
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from email.mime.base import MIMEBase
+from email import encoders
+
+logger = logging.getLogger("calendar_invites")
+
+
+ORGANIZER = "AI SubStack"
+CALENDAR_TIMEZONE = os.getenv("CALENDAR_TIMEZONE", "UTC")
+
+# Events whose date/time cannot be read from the to-do line keep the previous fixed slot.
+DEFAULT_EVENT_BEGIN = datetime.datetime(2025, 3, 5, 17, 15)
+DEFAULT_EVENT_DURATION = datetime.timedelta(minutes=90)
+
+EVENT_DATETIME_FORMATS = (
+    "%d/%m/%Y %I:%M %p", "%d/%m/%Y %I %p", "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %I:%M %p", "%m/%d/%Y %I %p", "%m/%d/%Y %H:%M",
+)
+
+
+def _escape(text: str) -> str:
+    return (text.replace("\\", "\\\\").replace(";", "\\;")
+                .replace(",", "\\,").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> bytes:
+    # RFC 5545 lines are at most 75 octets, continuation lines start with a space.
+    raw = line.encode("utf-8")
+    chunks = []
+    while len(raw) > 75:
+        cut = 75 if not chunks else 74
+        while cut and (raw[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(raw[:cut])
+        raw = raw[cut:]
+    chunks.append(raw)
+    return b"\r\n ".join(chunks) + b"\r\n"
+
+
+@functools.lru_cache(maxsize=None)
+def _calendar_template(organizer: str, organizer_email: str, timezone: str):
+    """Encoded calendar header, organizer line and footer, built once per organizer and timezone."""
+    header = b"".join(_fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//LLM Agent//Calendar Invites//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:REQUEST",
+        f"X-WR-TIMEZONE:{timezone}",
+    ))
+    organizer_line = _fold(f"ORGANIZER;CN={_escape(organizer)}:mailto:{organizer_email}")
+    footer = _fold("END:VCALENDAR")
+    return header, organizer_line, footer
+
+
+def parse_event_time(event_title: str, event_time: str) -> datetime.datetime:
+    """
+    Read the event start from the date in the title and the time of the to-do line.
+
+    Example call:
+    parse_event_time('"Team sync" on 12/03/2025', "5:15 PM")
+
+    Returns:
+        datetime.datetime: Naive start time in CALENDAR_TIMEZONE
+    """
+    pat = re.search(r"\d+\/\d+\/\d+", event_title)
+    if pat is not None:
+        value = pat.group() + " " + event_time.strip().strip('"').upper()
+        for fmt in EVENT_DATETIME_FORMATS:
+            try:
+                return datetime.datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+    return DEFAULT_EVENT_BEGIN
+
+
+def build_invite_ics(event_title: str, begin: datetime.datetime, attendees: List[str],
+                     organizer_email: str, location: str = "online",
+                     duration: datetime.timedelta = DEFAULT_EVENT_DURATION,
+                     organizer: str = ORGANIZER, timezone: str = CALENDAR_TIMEZONE) -> bytes:
+    """
+    Build an iCalendar REQUEST for one event and all its attendees, in memory.
+
+    Example call:
+    build_invite_ics("Team Meeting", datetime.datetime(2025, 6, 24, 14), ["person@example.com"], "me@example.com")
+
+    Args:
+        event_title (str): Title of the calendar event
+        begin (datetime.datetime): Naive start time in ``timezone``
+        attendees (List[str]): Attendee email addresses
+        organizer_email (str): Email address the invite is sent from
+        location (str, optional): Location of the event. Defaults to "online"
+        duration (datetime.timedelta, optional): Length of the event
+
+    Returns:
+        bytes: The .ics payload
+    """
+    header, organizer_line, footer = _calendar_template(organizer, organizer_email, timezone)
+    start = begin.replace(tzinfo=ZoneInfo(timezone)).astimezone(datetime.timezone.utc)
+    stamp_fmt = "%Y%m%dT%H%M%SZ"
+
+    # The same event always gets the same UID, so a resent invite updates it.
+    uid = hashlib.sha1(f"{event_title}|{start.isoformat()}".encode("utf-8")).hexdigest()
+
+    buffer = io.BytesIO()
+    buffer.write(header)
+    buffer.write(_fold("BEGIN:VEVENT"))
+    buffer.write(_fold(f"UID:{uid}@llm-agent"))
+    buffer.write(_fold(f"DTSTAMP:{datetime.datetime.now(datetime.timezone.utc).strftime(stamp_fmt)}"))
+    buffer.write(_fold(f"DTSTART:{start.strftime(stamp_fmt)}"))
+    buffer.write(_fold(f"DTEND:{(start + duration).strftime(stamp_fmt)}"))
+    buffer.write(_fold(f"SUMMARY:{_escape(event_title)}"))
+    buffer.write(_fold(f"LOCATION:{_escape(location)}"))
+    buffer.write(organizer_line)
+    for attendee in attendees:
+        buffer.write(_fold(f"ATTENDEE;ROLE=REQ-PARTICIPANT;PARTSTAT=NEEDS-ACTION;RSVP=TRUE:mailto:{attendee}"))
+    buffer.write(_fold("END:VEVENT"))
+    buffer.write(footer)
+    return buffer.getvalue()
+
+
+def build_invite_message(event_title: str, event_time: str, attendees: List[str],
+                         from_email: str, location: str = "online") -> MIMEMultipart:
+    """
+    Build the invite email of one event, addressed to all of its attendees.
+
+    Example call:
+    build_invite_message("Team Meeting", "5:15 PM", ["a@example.com", "b@example.com"], "me@example.com")
+    """
+    pat = re.search(r"\d+\/\d+\/\d+", event_title)
+    event_date = "" if pat is None else pat.group()
+
+    payload = build_invite_ics(event_title, parse_event_time(event_title, event_time),
+                               attendees, from_email, location)
+
+    msg = MIMEMultipart()
+    msg['From'] = from_email
+    msg['To'] = ', '.join(attendees)
+    msg['Subject'] = f"Calendar Invite: {event_title}"
+
+    body = f"You are invited to participate in {event_title} on {event_date} at {event_time}, {location} \
+    organized by {ORGANIZER}"
+    msg.attach(MIMEText(body, 'plain'))
+
+    part = MIMEBase('text', 'calendar', method="REQUEST", name="invite.ics")
+    part.set_payload(payload)
+    encoders.encode_base64(part)
+    part.add_header('Content-Disposition', 'attachment; filename="invite.ics"')
+    msg.attach(part)
+    return msg
+
+
+def send_invites(invites: List[Dict], from_email: str, email_password: str,
+                 server: Optional[smtplib.SMTP] = None, failed: Optional[List[Dict]] = None) -> int:
+    """
+    Send several event invites over a single SMTP session, one message per event.
+
+    Example call:
+    send_invites([{'event_title': "Team Meeting", 'event_time': "5 PM", 'attendees': ["a@example.com"]}],
+                 "me@example.com", "app-password")
+
+    Args:
+        invites (List[Dict]): Events with 'event_title', 'event_time', 'attendees' and optional 'location'
+        from_email (str): Sender and organizer address
+        email_password (str): SMTP password of the sender
+        server (smtplib.SMTP, optional): Logged-in session to reuse instead of opening one
+        failed (List[Dict], optional): Receives the invites that could not be sent
+
+    Returns:
+        int: Number of invites sent
+    """
+    messages = [
+        (invite['attendees'], build_invite_message(invite['event_title'], invite['event_time'],
+                                                   invite['attendees'], from_email,
+                                                   invite.get('location', "online")))
+        for invite in invites
+    ]
+
+    sent = set()
+    own_session = server is None
+    try:
+        if own_session:
+            server = smtplib.SMTP('smtp.gmail.com', 587)
+            server.starttls()
+            server.login(from_email, email_password)
+        for i, (attendees, msg) in enumerate(messages):
+            try:
+                server.sendmail(from_email, attendees, msg.as_string())
+                sent.add(i)
+                logger.info("Calendar invite sent successfully!")
+            except smtplib.SMTPException as e:
+                logger.info(f"Failed to send an invite to the person: {str(e)}")
+    except Exception as e:
+        logger.info(f"Failed to send an invite to the person: {str(e)}")
+    finally:
+        if own_session and server is not None:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                pass
+    if failed is not None:
+        failed.extend(invite for i, invite in enumerate(invites) if i not in sent)
+    return len(sent)
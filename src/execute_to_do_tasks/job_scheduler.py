@@ -0,0 +1,171 @@
+import os
+import time
+import atexit
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.background import BackgroundScheduler
+
+logger = logging.getLogger("job_scheduler")
+
+
+SCHEDULER_DB_PATH = os.getenv(
+    "SCHEDULER_DB_PATH",
+    os.path.join(os.path.expanduser("~"), ".llm_agent", "jobs.sqlite")
+)
+SCHEDULER_MAX_WORKERS = int(os.getenv("SCHEDULER_MAX_WORKERS", "4"))
+SCHEDULER_MISFIRE_GRACE_SECONDS = int(os.getenv("SCHEDULER_MISFIRE_GRACE_SECONDS", "300"))
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def todo_job_id(cmd_type: str, params: Dict) -> str:
+    """
+    Stable identifier of a to-do command, the same on every run and restart.
+
+    Example call:
+    todo_job_id("stock_alert", {"symbol": "NVDA", "alert_time": "9:30 AM"})
+    """
+    key = "|".join([cmd_type] + [f"{k}={' '.join(str(v).split())}" for k, v in sorted(params.items())])
+    return f"todo-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
+
+
+class JobMetrics:
+    """
+    Lag and run duration of scheduled jobs, fed by scheduler events.
+
+    Lag is the time between a run's scheduled time and its submission to the
+    executor. Duration is measured from submission to completion, so it also
+    includes any wait for a free executor worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._submitted = {}
+        self._jobs = {}
+
+    def _stats(self, job_id):
+        return self._jobs.setdefault(job_id, {
+            'runs': 0, 'failures': 0, 'missed': 0,
+            'last_lag_s': None, 'max_lag_s': 0.0,
+            'last_duration_s': None, 'max_duration_s': 0.0, 'total_duration_s': 0.0,
+        })
+
+    def on_event(self, event) -> None:
+        now = time.time()
+        with self._lock:
+            stats = self._stats(event.job_id)
+            if event.code == EVENT_JOB_SUBMITTED:
+                for run_time in event.scheduled_run_times:
+                    lag = max(0.0, now - run_time.timestamp())
+                    stats['last_lag_s'] = round(lag, 3)
+                    stats['max_lag_s'] = round(max(stats['max_lag_s'], lag), 3)
+                    self._submitted[(event.job_id, run_time)] = now
+            elif event.code == EVENT_JOB_MISSED:
+                stats['missed'] += 1
+            else:
+                submitted = self._submitted.pop((event.job_id, event.scheduled_run_time), None)
+                stats['runs'] += 1
+                if event.code == EVENT_JOB_ERROR:
+                    stats['failures'] += 1
+                if submitted is not None:
+                    duration = now - submitted
+                    stats['last_duration_s'] = round(duration, 3)
+                    stats['max_duration_s'] = round(max(stats['max_duration_s'], duration), 3)
+                    stats['total_duration_s'] += duration
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            view = {}
+            for job_id, stats in self._jobs.items():
+                stats = dict(stats)
+                timed_runs = stats['runs'] or 1
+                stats['avg_duration_s'] = round(stats.pop('total_duration_s') / timed_runs, 3)
+                view[job_id] = stats
+            return view
+
+
+job_metrics = JobMetrics()
+
+
+def get_scheduler() -> BackgroundScheduler:
+    """
+    Return the process-wide background scheduler, starting it on first use.
+
+    Jobs are persisted in a SQLite job store, so they survive restarts. Missed
+    runs are coalesced into one and still run within the misfire grace time,
+    and jobs execute on a bounded thread pool.
+
+    Example call:
+    scheduler = get_scheduler()
+
+    Returns:
+        BackgroundScheduler: The shared, running scheduler
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            os.makedirs(os.path.dirname(os.path.abspath(SCHEDULER_DB_PATH)), exist_ok=True)
+            scheduler = BackgroundScheduler(
+                jobstores={'default': SQLAlchemyJobStore(url=f"sqlite:///{SCHEDULER_DB_PATH}")},
+                executors={'default': ThreadPoolExecutor(max_workers=SCHEDULER_MAX_WORKERS)},
+                job_defaults={
+                    'coalesce': True,
+                    'misfire_grace_time': SCHEDULER_MISFIRE_GRACE_SECONDS,
+                    'max_instances': 1,
+                }
+            )
+            scheduler.add_listener(
+                job_metrics.on_event,
+                EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED
+            )
+            scheduler.start()
+            atexit.register(shutdown_scheduler)
+            logger.info(f"Started the shared job scheduler with {len(scheduler.get_jobs())} persisted jobs.")
+            _scheduler = scheduler
+        return _scheduler
+
+
+def shutdown_scheduler(wait: bool = False) -> None:
+    """Stop the shared scheduler if it was started. Persisted jobs are kept."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown(wait=wait)
+            _scheduler = None
+
+
+def get_job_metrics() -> Dict[str, Dict]:
+    """
+    Metrics view of the scheduled jobs of this process.
+
+    Example call:
+    get_job_metrics()
+
+    Returns:
+        Dict[str, Dict]: Per job id: runs, failures, missed runs, last/max lag and
+        last/max/avg run duration in seconds, plus the next scheduled run time
+    """
+    view = job_metrics.snapshot()
+    if _scheduler is not None:
+        for job in _scheduler.get_jobs():
+            stats = view.setdefault(job.id, {})
+            stats['next_run_time'] = job.next_run_time.isoformat() if job.next_run_time else None
+    return view
+
+
+def format_job_metrics(view: Optional[Dict[str, Dict]] = None) -> str:
+    """Render get_job_metrics() as a plain text table."""
+    view = get_job_metrics() if view is None else view
+    columns = ['runs', 'failures', 'missed', 'last_lag_s', 'max_lag_s', 'avg_duration_s', 'max_duration_s', 'next_run_time']
+    rows = [["job_id"] + columns]
+    for job_id, stats in sorted(view.items()):
+        rows.append([job_id] + [str(stats.get(column, '-')) for column in columns])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
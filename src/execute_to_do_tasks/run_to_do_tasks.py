@@ -1,29 +1,28 @@
 import shutil
 import os
-import re
 import smtplib
 import traceback
+import itertools
 import logging
-import yfinance as yf 
 import datetime
 from email.mime.text import MIMEText
 from typing import List, Dict
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
-from apscheduler.schedulers.background import BackgroundScheduler
-from ics import Calendar, Event
-
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
 from typing import Dict, List
 
+from apscheduler.jobstores.base import ConflictingIdError
 from dotenv import load_dotenv
 
+from src.execute_to_do_tasks.calendar_invites import send_invites
+from src.execute_to_do_tasks.job_scheduler import get_scheduler, todo_job_id
+from src.execute_to_do_tasks.stock_quotes import format_stock_update, quote_service
+from src.execute_to_do_tasks.todo_parser import load_todo_state, save_todo_states, stream_todo_commands
+from src.observability.tracing import span
+
 load_dotenv()
 
 __name__ = "run_to_do"
-logging.basicConfig(level = logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -42,7 +41,7 @@ EMAIL_CREDS = {
 # Notification System
 #---------------------
 
-def send_email(subject: str, body: str, recipient: str) -> None:
+def send_email(subject: str, body: str, recipient: str) -> bool:
     """
     Send email using SMTP.
     
@@ -55,10 +54,7 @@ def send_email(subject: str, body: str, recipient: str) -> None:
         recipient (str): Recipient email address
 
     Returns:
-        None: Function does not return a value
-
-    Raises:
-        Exception: If email sending fails
+        bool: True if the email was sent, False if the SMTP server refused it
     """
 
     msg = MIMEText(body)
@@ -71,10 +67,11 @@ def send_email(subject: str, body: str, recipient: str) -> None:
             server.login(EMAIL_CREDS['email'], EMAIL_CREDS['password'])
             server.send_message(msg)
             logger.info("Sucess: Email Notification has been sent..!!")
-    except smtplib.SMTPException as e:
+    except OSError as e:  # smtplib.SMTPException, or the server could not be reached
         logger.info(f"Exception: Email failed to send: {str(e)}")
+        return False
     
-    return
+    return True
 
 
 
@@ -93,73 +90,19 @@ def send_calendar_invite(event_title, event_time, to_emails, location="online"):
         location (str, optional): Location of the event. Defaults to "online"
         
     Returns:
-        str: Confirmation message or error details of the calendar invite operation
+        int: Number of invites sent, a single message addressed to every recipient
     """
-    pat = re.search(r"\d+\/\d+\/\d+", event_title) 
-
-    if pat is None:
-        event_date = ""
-    else:
-        event_date = pat.group()
-
-    from_email = EMAIL_CREDS.get("email")
-    email_password = EMAIL_CREDS.get("password")
-
-    # Create calendar event
-    calendar = Calendar()
-    event = Event()
-    event.name = event_title
-    organizer = "AI SubStack"
-    
-    # Convert date string to datetime
-    # start_time = datetime.strptime(f"{event_date} 09:00:00", "%Y-%m-%d %H:%M:%S")
-    # end_time = datetime.strptime(f"{event_date} 10:00:00", "%Y-%m-%d %H:%M:%S")
-    
-    event.begin = "2025-03-05 17:15:00"
-    event.end = "2025-03-05 18:45:00"
-    event.location = location
-    
-    calendar.events.add(event)
-    
-    # Save the calendar to a file temporarily
-    with open('invite.ics', 'w') as f:
-        f.write(str(calendar))
-    
-    # Create email
-    msg = MIMEMultipart()
-    msg['From'] = from_email
-    msg['To'] = ', '.join(to_emails)
-    msg['Subject'] = f"Calendar Invite: {event_title}"
-    
-    body = f"You are invited to participate in {event_title} on {event_date} at {event_time}, {location} \
-    organized by {organizer}"
-    msg.attach(MIMEText(body, 'plain'))
-    
-    # Attach the calendar file
-    attachment = open('invite.ics', 'rb')
-    part = MIMEBase('text', 'calendar', method="REQUEST", name="invite.ics")
-    part.set_payload(attachment.read())
-    encoders.encode_base64(part)
-    part.add_header('Content-Disposition', 'attachment; filename="invite.ics"')
-    msg.attach(part)
-    
-    # Send email
-    try:
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(from_email, email_password)
-        text = msg.as_string()
-        server.sendmail(from_email, to_emails, text)
-        server.quit()
-        logger.info("Calendar invite sent successfully!")
-    except Exception as e:
-        logger.info(f"Failed to send an invite to the person: {str(e)}")
+    return send_invites(
+        [{'event_title': event_title, 'event_time': event_time, 'attendees': to_emails, 'location': location}],
+        from_email=EMAIL_CREDS.get("email"),
+        email_password=EMAIL_CREDS.get("password")
+    )
 
 
 
 def get_stock_price(symbol: str) -> str:
     """
-    Get current stock price using Alpha Vantage API.
+    Get current stock price through the shared, cached quote service.
     
     Example call:
     get_stock_price("AAPL")
@@ -168,42 +111,25 @@ def get_stock_price(symbol: str) -> str:
         symbol (str): Stock ticker symbol
 
     Returns:
-        str: Formatted stock information with price and change percentage
-
-    Raises:
-        Exception: If API request fails
+        str: Formatted stock information with price and change percentage,
+        None if the quote could not be fetched
     """
-    try:
-        ticker = yf.Ticker("NVDA")
-        
-        # Get the ticker info
-        info = ticker.info
-        
-        # Extract relevant information
-        price = info.get('regularMarketPrice', 'N/A')
-        change_percent = info.get('regularMarketChangePercent', 'N/A')
-        
-        # Format change percent if available
-        if change_percent != 'N/A':
-            change_percent = f"{change_percent:.2f}%"
-
-        logger.info("Retrieved Stock Information Successfully through online APIs.")
-        return f"""
-        {symbol} Stock Update:
-        Price: ${price}
-        Change: {change_percent}
-        """
-    except Exception as e:
-        logger.info(f"Exception : Stock data fetch failed: {str(e)}")
+    quote = quote_service.get_quote(symbol)
+    if quote is None:
+        logger.info(f"Exception : Stock data fetch failed for {symbol}")
         return
 
+    logger.info("Retrieved Stock Information Successfully through online APIs.")
+    return format_stock_update(symbol, quote)
+
 #-------------------
 # Scheduler System
 #-------------------
 
 def setup_scheduler():
     """
-    Configure background scheduler for recurring tasks.
+    Get the shared background scheduler for recurring tasks.
+    The scheduler is created once per process and its jobs are persisted.
     
     Example call:
     scheduler = setup_scheduler()
@@ -212,11 +138,159 @@ def setup_scheduler():
         None: This function takes no arguments
         
     Returns:
-        BackgroundScheduler: Initialized scheduler instance ready for adding jobs
+        BackgroundScheduler: Running scheduler instance ready for adding jobs
+    """
+    return get_scheduler()
+
+
+#-------------------
+# Command Handlers
+#-------------------
+
+def _handle_email_reminder(message):
+    return send_email(
+        subject="Reminder Notification",
+        body=f"Reminder: {message}",
+        recipient=EMAIL_CREDS['email']
+    )
+
+
+def _send_stock_alert(symbol):
+    # Alerts firing at the same minute run together, and the quote service
+    # fetches their symbols in one batched download.
+    quote = quote_service.get_quote(symbol)
+    if quote is None:
+        logger.info(f"Exception : Stock data fetch failed for {symbol}")
+        return
+    send_email(
+        subject=f"{symbol} Stock Update",
+        body=format_stock_update(symbol, quote),
+        recipient=EMAIL_CREDS['email']
+    )
+
+
+def _parse_alert_time(alert_time):
+    alert_time = alert_time.strip().strip('"').upper()
+    for fmt in ("%H:%M", "%I:%M %p", "%I:%M%p", "%I %p", "%I%p"):
+        try:
+            parsed = datetime.datetime.strptime(alert_time, fmt)
+            return parsed.hour, parsed.minute
+        except ValueError:
+            continue
+    # Unparseable times keep the old behaviour of firing two minutes from now.
+    date_ = datetime.datetime.now() + datetime.timedelta(minutes=2)
+    return date_.hour, date_.minute
+
+
+def _handle_stock_alert(symbol, alert_time):
+    scheduler = setup_scheduler()
+    hour, minute = _parse_alert_time(alert_time)
+
+    # One job per alert, keyed by the to-do line. The job store rejects a
+    # duplicate id atomically, so re-running the same line (from any process)
+    # cannot schedule it twice.
+    try:
+        scheduler.add_job(
+            STOCK_ALERT_JOB,
+            'cron',
+            hour=hour,
+            minute=minute,
+            kwargs={'symbol': symbol.strip().strip('"').upper()},
+            id=todo_job_id('stock_alert', {'symbol': symbol, 'alert_time': alert_time}),
+            replace_existing=False
+        )
+    except ConflictingIdError:
+        logger.info(f"Stock alert for {symbol} is already scheduled.")
+        return True
+    logger.info("Successfully Scheduled CRON Job.!!!")
+    return True
+
+
+# Jobs are persisted by reference. This module overrides __name__, so the
+# reference is built from its real import path.
+STOCK_ALERT_JOB = f"{__spec__.name}:_send_stock_alert"
+
+# Commands run as soon as they are read, and return whether they were delivered.
+# Stock alerts are collected and scheduled afterwards, by the process that owns
+# the job store.
+COMMAND_HANDLERS = {
+    'email_reminder': _handle_email_reminder,
+}
+
+
+def _read_todo_file(folder_path, update):
     """
-    scheduler = BackgroundScheduler()
-    scheduler.start()
-    return scheduler
+    Run the new commands of a folder's to-do file, without writing to the job store or the cursor file.
+
+    Commands that failed on an earlier run are retried first. ``update`` is
+    filled in as the file is read, so it is usable even if reading fails
+    midway: {'file_path', 'state' (the advanced cursor, with the commands that
+    failed again in 'retry'), 'stock_alerts' (params of the alerts to
+    schedule)}. Apply it with _commit_todo_updates.
+    """
+    file_path = os.path.join(folder_path, "to_do.txt")
+    state = load_todo_state(file_path)
+    retry, state['retry'] = state['retry'], []
+    update.update(file_path=file_path, state=state, stock_alerts=[])
+
+    # Attendees of the same event are collected and invited with one message per event.
+    pending_invites = {}
+
+    for cmd in itertools.chain(retry, stream_todo_commands(file_path, state)):
+        logger.debug(f"Command: {cmd}")
+        if cmd['type'] == 'calendar_invite':
+            params = cmd['params']
+            attendees = pending_invites.setdefault((params['event_title'], params['event_time']), [])
+            if params['attendees'] not in attendees:
+                attendees.append(params['attendees'])
+            continue
+        if cmd['type'] == 'stock_alert':
+            update['stock_alerts'].append(cmd['params'])
+            continue
+        try:
+            with span(f"todo.{cmd['type']}", cat="tool"):
+                delivered = COMMAND_HANDLERS[cmd['type']](**cmd['params'])
+        except Exception:
+            logger.info(f"Failed to process command: {traceback.format_exc()}")
+            delivered = False
+        if not delivered:
+            state['retry'].append(cmd)
+
+    if pending_invites:
+        invites = [{'event_title': title, 'event_time': time_, 'attendees': attendees}
+                   for (title, time_), attendees in pending_invites.items()]
+        failed = []
+        with span("todo.calendar_invites", cat="tool", events=len(invites)):
+            try:
+                send_invites(invites, from_email=EMAIL_CREDS.get("email"),
+                             email_password=EMAIL_CREDS.get("password"), failed=failed)
+            except Exception:
+                logger.info(f"Failed to process command: {traceback.format_exc()}")
+                failed = invites
+        state['retry'].extend(
+            {'type': 'calendar_invite', 'params': {'event_title': invite['event_title'],
+                                                   'event_time': invite['event_time'], 'attendees': attendee}}
+            for invite in failed for attendee in invite['attendees']
+        )
+
+
+def _commit_todo_updates(updates):
+    """
+    Schedule the collected stock alerts and save the cursors of one or more to-do files.
+
+    Alerts that could not be scheduled are kept in their file's cursor, for the next run to retry.
+    """
+    for update in updates:
+        for params in update.get('stock_alerts', []):
+            try:
+                with span("todo.stock_alert", cat="tool"):
+                    scheduled = _handle_stock_alert(**params)
+            except Exception:
+                logger.info(f"Failed to process command: {traceback.format_exc()}")
+                scheduled = False
+            if not scheduled:
+                update['state']['retry'].append({'type': 'stock_alert', 'params': params})
+    save_todo_states({update['file_path']: update['state'] for update in updates if 'state' in update})
 
 
 #-------------------
@@ -225,76 +299,22 @@ def setup_scheduler():
 
 def process_todo_file(folder_path: str) -> None:
     """
-    Main function to process todo.txt and execute commands.
+    Main function to process to_do.txt and execute commands.
+    Only the lines appended since the previous run are executed, along with
+    the commands that could not be delivered on an earlier run.
     
     Example call:
-    process_todo_file("/path/to/todo.txt")
+    process_todo_file("/path/to/folder")
 
     Args:
-        file_path (str): Path to todo.txt file
+        folder_path (str): Path to the folder containing to_do.txt
         
     Returns:
         None: This function does not return a value
     """
-    commands = []
-    patterns = {
-        'email_reminder': r'Remind me to (.*?) via email',
-        'calendar_invite': r'Add a calendar invite for (.*?) date at (.*?) and share it with "(.*?)"',
-        'stock_alert': r'Share the stock price for (.*?) every day at (.*?) via email with me'
-    }
-    file_path = os.path.join(folder_path, "to_do.txt")
-
-    with open(file_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            for cmd_type, pattern in patterns.items():
-                match = re.match(pattern, line)
-                if match:
-                    commands.append({
-                        'type': cmd_type,
-                        'params': match.groups()
-                    })
-                    break
-
-    scheduler = setup_scheduler()
-
-    for cmd in commands:
-        logger.info("Command: ", cmd)
-        try:
-            if cmd['type'] == 'email_reminder':
-                message = cmd['params'][0]
-                send_email(
-                    subject="Reminder Notification",
-                    body=f"Reminder: {message}",
-                    recipient=EMAIL_CREDS['email']
-                )
-
-            elif cmd['type'] == 'calendar_invite':
-                event_title, event_time, attendees = cmd['params']
-                event_id = send_calendar_invite(
-                    event_title=event_title,
-                    event_time=event_time,
-                    to_emails=[attendees]
-                )
-
-            elif cmd['type'] == 'stock_alert':
-                symbol, _ = cmd['params']
-                date_ = datetime.datetime.now() + datetime.timedelta(minutes=2) 
-                time_str = datetime.datetime.strftime(date_, '%Y-%m-%d %H:%M:%S') 
-                hour, minute = time_str.split(" ")[1].split(":")[0], time_str.split(" ")[1].split(":")[1]
-                time_parts = time_str.split(':')
-    
-                scheduler.add_job(
-                    lambda: send_email(
-                        subject=f"{symbol} Stock Update",
-                        body=get_stock_price(symbol),
-                        recipient=EMAIL_CREDS['email']
-                    ),
-                    'cron',
-                    hour=hour,
-                    minute=minute
-                )
-                logger.info("Successfully Scheduled CRON Job.!!!")
-        except Exception as e:
-            logger.info(f"Failed to process command: {str(traceback.format_exc(e))}")
-    return
\ No newline at end of file
+    update = {}
+    try:
+        _read_todo_file(folder_path, update)
+    finally:
+        _commit_todo_updates([update])
+    return
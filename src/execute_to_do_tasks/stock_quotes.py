@@ -0,0 +1,178 @@
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("stock_quotes")
+
+
+# Quotes younger than this many seconds are served from the cache.
+QUOTE_TTL_SECONDS = float(os.getenv("QUOTE_TTL_SECONDS", "60"))
+
+# Symbols requested within this many seconds of each other are fetched in one provider call.
+QUOTE_BATCH_WINDOW_SECONDS = float(os.getenv("QUOTE_BATCH_WINDOW_SECONDS", "0.5"))
+
+# A provider takes a list of symbols and returns {symbol: quote} for the symbols
+# it could resolve, where a quote is {'price': float, 'change_percent': float}.
+QuoteProvider = Callable[[List[str]], Dict[str, Dict]]
+
+
+def fetch_yfinance_quotes(symbols: List[str]) -> Dict[str, Dict]:
+    """
+    Fetch the latest price and daily change of several symbols in one batched download.
+
+    Example call:
+    fetch_yfinance_quotes(["NVDA", "AAPL"])
+
+    Args:
+        symbols (List[str]): Stock ticker symbols
+
+    Returns:
+        Dict[str, Dict]: {symbol: {'price': float, 'change_percent': float}} for the
+        symbols that returned data
+    """
+    import yfinance as yf
+
+    data = yf.download(symbols, period="5d", interval="1d", group_by="column",
+                       auto_adjust=False, progress=False, threads=True)
+    closes = data["Close"]
+
+    quotes = {}
+    for symbol in symbols:
+        if symbol not in closes:
+            continue
+        series = closes[symbol].dropna()
+        if series.empty:
+            continue
+        price = float(series.iloc[-1])
+        change_percent = None
+        if len(series) > 1 and series.iloc[-2]:
+            change_percent = (price - float(series.iloc[-2])) / float(series.iloc[-2]) * 100
+        quotes[symbol] = {'price': round(price, 2), 'change_percent': change_percent}
+    return quotes
+
+
+class _Flight:
+    """A provider call in progress, shared by every caller waiting on its symbols."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.symbols = []
+        self.quotes = {}
+
+
+class QuoteService:
+    """
+    Stock quotes with batching, a short TTL cache and single-flight fetching.
+
+    Symbols missing from the cache join an open batch, which the first caller
+    fetches with one provider call after ``batch_window`` seconds, so callers
+    arriving together (e.g. the stock alerts due at the same minute) share one
+    download. A symbol that is already being fetched is not fetched again, the
+    caller waits for that fetch instead.
+    """
+
+    def __init__(self, provider: Optional[QuoteProvider] = None, ttl: float = QUOTE_TTL_SECONDS,
+                 batch_window: float = QUOTE_BATCH_WINDOW_SECONDS):
+        self.provider = provider or fetch_yfinance_quotes
+        self.ttl = ttl
+        self.batch_window = batch_window
+        self._cache = {}
+        self._in_flight = {}
+        self._open_batch = None
+        self._lock = threading.Lock()
+
+    def get_quotes(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Get quotes for several symbols.
+
+        Example call:
+        quote_service.get_quotes(["NVDA", "AAPL"])
+
+        Args:
+            symbols (Iterable[str]): Stock ticker symbols
+
+        Returns:
+            Dict[str, Dict]: {symbol: quote} for the symbols a quote was found for
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols))
+        quotes, waiting, batch = {}, {}, None
+
+        with self._lock:
+            now = time.monotonic()
+            for symbol in symbols:
+                cached = self._cache.get(symbol)
+                if cached is not None and now - cached[0] < self.ttl:
+                    quotes[symbol] = cached[1]
+                elif symbol in self._in_flight:
+                    waiting[symbol] = self._in_flight[symbol]
+                else:
+                    if self._open_batch is None:
+                        # This caller opened the batch, so it fetches it.
+                        self._open_batch = batch = _Flight()
+                    self._open_batch.symbols.append(symbol)
+                    self._in_flight[symbol] = waiting[symbol] = self._open_batch
+
+        if batch is not None:
+            self._fetch_batch(batch)
+
+        for symbol, flight in waiting.items():
+            flight.done.wait()
+            if symbol in flight.quotes:
+                quotes[symbol] = flight.quotes[symbol]
+
+        return quotes
+
+    def _fetch_batch(self, flight: _Flight) -> None:
+        if self.batch_window:
+            time.sleep(self.batch_window)
+        with self._lock:
+            self._open_batch = None
+            to_fetch = list(flight.symbols)
+        try:
+            flight.quotes = self.provider(to_fetch)
+        except Exception as e:
+            logger.info(f"Exception : Stock data fetch failed for {to_fetch}: {str(e)}")
+        finally:
+            with self._lock:
+                fetched_at = time.monotonic()
+                for symbol in to_fetch:
+                    del self._in_flight[symbol]
+                    if symbol in flight.quotes:
+                        self._cache[symbol] = (fetched_at, flight.quotes[symbol])
+            flight.done.set()
+
+    def get_quote(self, symbol: str) -> Optional[Dict]:
+        """
+        Get the quote of a single symbol, or None if it could not be fetched.
+
+        Example call:
+        quote_service.get_quote("NVDA")
+        """
+        return self.get_quotes([symbol]).get(symbol.strip().upper())
+
+    def clear(self) -> None:
+        """Drop every cached quote."""
+        with self._lock:
+            self._cache.clear()
+
+
+def format_stock_update(symbol: str, quote: Dict) -> str:
+    """
+    Format a quote as the body of a stock update email.
+
+    Example call:
+    format_stock_update("NVDA", {'price': 120.5, 'change_percent': 1.25})
+    """
+    change_percent = quote.get('change_percent')
+    change_percent = 'N/A' if change_percent is None else f"{change_percent:.2f}%"
+    return f"""
+        {symbol} Stock Update:
+        Price: ${quote.get('price', 'N/A')}
+        Change: {change_percent}
+        """
+
+
+# Shared by every stock alert of the process.
+quote_service = QuoteService()
@@ -0,0 +1,225 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import contextlib
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger("todo_parser")
+
+
+# Where the per to-do file read cursors are persisted between runs.
+TODO_STATE_PATH = os.getenv(
+    "TODO_STATE_PATH",
+    os.path.join(os.path.expanduser("~"), ".llm_agent", "todo_state.json")
+)
+
+# Number of bytes right before the saved offset that are fingerprinted, so a
+# rewritten or truncated to-do file is detected without re-hashing all of it.
+CHECKSUM_WINDOW = 4096
+
+# A last line without a newline is only processed once the file has not been
+# modified for this long, since the writer may still be appending to it.
+TODO_SETTLE_SECONDS = float(os.getenv("TODO_SETTLE_SECONDS", "2"))
+
+# One alternation for every command type. The outer named group identifies the
+# command (``match.lastgroup``), the inner named groups hold its parameters.
+TODO_COMMAND_PATTERN = re.compile(
+    r'(?P<email_reminder>Remind me to (?P<message>.*?) via email)'
+    r'|(?P<calendar_invite>Add a calendar invite for (?P<event_title>.*?) date at (?P<event_time>.*?)'
+    r' and share it with "(?P<attendees>.*?)")'
+    r'|(?P<stock_alert>Share the stock price for (?P<symbol>.*?) every day at (?P<alert_time>.*?)'
+    r' via email with me)'
+)
+
+COMMAND_FIELDS = {
+    'email_reminder': ('message',),
+    'calendar_invite': ('event_title', 'event_time', 'attendees'),
+    'stock_alert': ('symbol', 'alert_time'),
+}
+
+
+def parse_todo_line(line: str) -> Optional[Dict]:
+    """
+    Parse a single to-do line into a command.
+
+    Example call:
+    parse_todo_line('Remind me to "pay rent" via email')
+
+    Args:
+        line (str): One line of the to-do file
+
+    Returns:
+        Optional[Dict]: {'type': command_type, 'params': {name: value}} or None
+        if the line does not hold a known command
+    """
+    match = TODO_COMMAND_PATTERN.match(line.strip())
+    if match is None:
+        return None
+    cmd_type = match.lastgroup
+    return {
+        'type': cmd_type,
+        'params': {name: match.group(name) for name in COMMAND_FIELDS[cmd_type]}
+    }
+
+
+def _window_checksum(f, offset: int) -> str:
+    start = max(0, offset - CHECKSUM_WINDOW)
+    f.seek(start)
+    return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def load_todo_state(file_path: str, state_path: str = TODO_STATE_PATH) -> Dict:
+    """
+    Load the saved read cursor of a to-do file.
+
+    Example call:
+    load_todo_state("/path/to/to_do.txt")
+
+    Args:
+        file_path (str): Path to the to-do file
+        state_path (str, optional): JSON file holding the cursors of all to-do files
+
+    Returns:
+        Dict: {'offset': int, 'checksum': str, 'retry': List[Dict]}. The offset is
+        0 when the file was never processed, or when it was truncated or rewritten
+        since the last run. 'retry' holds the commands, already read, whose
+        delivery failed on an earlier run.
+    """
+    state = {'offset': 0, 'checksum': '', 'retry': []}
+    try:
+        with open(state_path, 'r') as f:
+            saved = json.load(f).get(os.path.abspath(file_path))
+    except (FileNotFoundError, json.JSONDecodeError):
+        saved = None
+
+    if not saved:
+        return state
+
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if saved['offset'] <= size and _window_checksum(f, saved['offset']) == saved['checksum']:
+                state.update(saved)
+            else:
+                logger.info("The to-do file changed since the last run, processing it from the start.")
+    except FileNotFoundError:
+        pass
+    return state
+
+
+@contextlib.contextmanager
+def _locked(state_path: str):
+    """Hold an exclusive lock on ``state_path + ".lock"``, across processes."""
+    os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+    with open(f"{state_path}.lock", 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def save_todo_states(states: Dict[str, Dict], state_path: str = TODO_STATE_PATH) -> None:
+    """
+    Persist the read cursors of several to-do files in one locked read-modify-write.
+
+    Example call:
+    save_todo_states({"/a/to_do.txt": state_a, "/b/to_do.txt": state_b})
+
+    Args:
+        states (Dict[str, Dict]): To-do file path to its cursor
+        state_path (str, optional): JSON file holding the cursors of all to-do files
+
+    Returns:
+        None
+    """
+    with _locked(state_path):
+        try:
+            with open(state_path, 'r') as f:
+                all_states = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            all_states = {}
+
+        for file_path, state in states.items():
+            all_states[os.path.abspath(file_path)] = {'offset': state['offset'], 'checksum': state['checksum'],
+                                                      'retry': state.get('retry', [])}
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(state_path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(all_states, f)
+            os.replace(tmp_path, state_path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+            raise
+
+
+def save_todo_state(file_path: str, state: Dict, state_path: str = TODO_STATE_PATH) -> None:
+    """
+    Persist the read cursor of a to-do file.
+
+    Example call:
+    save_todo_state("/path/to/to_do.txt", {'offset': 120, 'checksum': '...', 'retry': []})
+
+    Args:
+        file_path (str): Path to the to-do file
+        state (Dict): Cursor returned by load_todo_state and advanced by stream_todo_commands
+        state_path (str, optional): JSON file holding the cursors of all to-do files
+
+    Returns:
+        None
+    """
+    save_todo_states({file_path: state}, state_path)
+
+
+def stream_todo_commands(file_path: str, state: Dict) -> Iterator[Dict]:
+    """
+    Yield the commands of the lines appended to a to-do file since ``state``.
+
+    Commands are yielded as soon as their line is parsed. ``state`` is advanced in
+    place past every complete line, so it can be saved even if the consumer stops
+    early; commands that could not be delivered go to ``state['retry']`` instead. A trailing line without a newline is only processed once the file has
+    been left unmodified for TODO_SETTLE_SECONDS, since the writer may still be
+    appending to it; otherwise it is left for the next run.
+
+    Example call:
+    state = load_todo_state("/path/to/to_do.txt")
+    for command in stream_todo_commands("/path/to/to_do.txt", state):
+        ...
+    save_todo_state("/path/to/to_do.txt", state)
+
+    Args:
+        file_path (str): Path to the to-do file
+        state (Dict): Cursor returned by load_todo_state
+
+    Returns:
+        Iterator[Dict]: Parsed commands, see parse_todo_line
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(state['offset'])
+        offset = state['offset']
+        settled = time.time() - os.fstat(f.fileno()).st_mtime >= TODO_SETTLE_SECONDS
+        try:
+            for raw_line in f:
+                if not raw_line.endswith(b"\n") and not settled:
+                    logger.info("The last line of the to-do file has no newline yet, leaving it for the next run.")
+                    break
+                offset += len(raw_line)
+                state['offset'] = offset
+                command = parse_todo_line(raw_line.decode('utf-8', errors='replace'))
+                if command is not None:
+                    yield command
+        finally:
+            state['checksum'] = _window_checksum(f, state['offset'])
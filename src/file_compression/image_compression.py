@@ -2,8 +2,10 @@ import os
 import requests
 from dotenv import load_dotenv
 import logging
+
+from src.observability.tracing import span
+
 __name__ = "__image_compressor__"
-logging.basicConfig(level = logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
@@ -14,6 +16,8 @@ API_KEYS = {
     'tinypng': os.getenv('tinify_api_key')
 }
 
+TINIFY_SHRINK_URL = os.getenv('tinify_shrink_url', 'https://api.tinify.com/shrink')
+
 
 def compress_image(file_path: str) -> str:
     """
@@ -32,19 +36,19 @@ def compress_image(file_path: str) -> str:
         Exception: If API request fails or non-image file
     """
     try:
-        url = 'https://api.tinify.com/shrink'
+        url = TINIFY_SHRINK_URL
         auth = ('api', API_KEYS['tinypng'])
         
         logger.info("Started communicating with TinyPNG online service to compress the given input image..")
 
-        with open(file_path, 'rb') as f:
+        with span("compress_image.upload", cat="file", file=file_path), open(file_path, 'rb') as f:
             response = requests.post(url, auth=auth, data=f.read())
             
         if response.status_code == 201:
             logger.info("Processed and compressed the given input image successfully.....")
             b = file_path.split(".")[0]
             output_path = f"{b}_compressed.png"
-            with open(output_path, 'wb') as f:
+            with span("compress_image.download", cat="file", file=output_path), open(output_path, 'wb') as f:
                 f.write(requests.get(response.json()['output']['url']).content)
                 logger.info("Saved the resultant compressed image successfully...")
 
@@ -2,12 +2,12 @@ import os
 import logging
 from dotenv import load_dotenv
 from pylovepdf.tools.compress import Compress
-import os
+
+from src.observability.tracing import span
 
 load_dotenv()
 __name__ = "__pdf_compressor__"
 
-logging.basicConfig(level = logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Environment variables (should be set in your system)
@@ -41,9 +41,11 @@ def compress_pdf(file_path: str) -> str:
         t = Compress(API_KEYS["ilovepdf"], verify_ssl=True, proxies=False)
         t.add_file(file_path)
         t.set_output_folder(output_path)
-        t.execute()
+        with span("compress_pdf.execute", cat="file", file=file_path):
+            t.execute()
         logger.info("Compression task executed successfully!!!!")
-        t.download()
+        with span("compress_pdf.download", cat="file", file=output_path):
+            t.download()
         t.delete_current_task()
         logger.info("Downloaded and saved the comprressed pdf successfully in the respective folder...")
         
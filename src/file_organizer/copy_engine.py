@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import mmap
+import time
+import errno
+import shutil
+import hashlib
+import logging
+from typing import NamedTuple
+
+from src.observability.tracing import span
+
+logger = logging.getLogger("copy_engine")
+
+
+# Files at least this large are copied by the engine, concurrently, when moving across filesystems.
+LARGE_FILE_BYTES = int(float(os.getenv("COPY_LARGE_FILE_MB", "64")) * 1024 * 1024)
+
+# Large files copied at the same time.
+COPY_MAX_WORKERS = int(os.getenv("COPY_MAX_WORKERS", "4"))
+
+# Buffer of the chunked fallback. mmap'ed, so it is page aligned.
+COPY_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Hash the whole source and copy after a move, on top of the size check.
+COPY_VERIFY_CHECKSUM = os.getenv("COPY_VERIFY_CHECKSUM", "0").lower() in ("1", "true", "yes")
+
+# Bytes right before a resume offset compared between source and partial copy,
+# so a partial copy that does not match its source is restarted from scratch.
+RESUME_CHECKSUM_WINDOW = 1024 * 1024
+
+PARTIAL_SUFFIX = ".partial"
+
+# Linux FICLONE ioctl: share the source's extents instead of copying them (btrfs, XFS).
+FICLONE = 0x40049409
+
+# Errors meaning "this copy method is not available here", so the next one is tried.
+_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY,
+                errno.EBADF, errno.EPERM}
+
+
+class CopyResult(NamedTuple):
+    src: str
+    dst: str
+    bytes_copied: int
+    seconds: float
+    method: str
+    resumed_from: int = 0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes_copied / (1024 * 1024) / self.seconds if self.seconds > 0 else float('inf')
+
+
+def same_filesystem(path_a: str, path_b: str) -> bool:
+    return os.stat(path_a).st_dev == os.stat(path_b).st_dev
+
+
+def _window_checksum(fd: int, end: int) -> str:
+    start = max(0, end - RESUME_CHECKSUM_WINDOW)
+    return hashlib.blake2b(os.pread(fd, end - start, start)).hexdigest()
+
+
+def file_checksum(path: str) -> str:
+    """blake2b of a whole file."""
+    h = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_BYTES), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _reflink(src_fd: int, dst_fd: int, size: int) -> int:
+    import fcntl
+    fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    return size
+
+
+def _raise_short_copy(method: str, offset: int, size: int):
+    # Some filesystems report an unsupported copy as 0 bytes copied instead of an error.
+    raise OSError(errno.EOPNOTSUPP, f"{method} copied nothing at {offset} of {size} bytes")
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, offset: int, size: int) -> int:
+    while offset < size:
+        n = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+        if n == 0:
+            _raise_short_copy('copy_file_range', offset, size)
+        offset += n
+    return offset
+
+
+def _sendfile(src_fd: int, dst_fd: int, offset: int, size: int) -> int:
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    while offset < size:
+        n = os.sendfile(dst_fd, src_fd, offset, min(size - offset, 1 << 30))
+        if n == 0:
+            _raise_short_copy('sendfile', offset, size)
+        offset += n
+    return offset
+
+
+def _chunked(src_fd: int, dst_fd: int, offset: int, size: int) -> int:
+    buffer = mmap.mmap(-1, COPY_CHUNK_BYTES)
+    view = memoryview(buffer)
+    try:
+        while offset < size:
+            if hasattr(os, 'preadv'):
+                n = os.preadv(src_fd, [view], offset)
+            else:
+                os.lseek(src_fd, offset, os.SEEK_SET)
+                n = os.readv(src_fd, [view])
+            if n == 0:
+                break
+            written = 0
+            while written < n:
+                written += os.pwrite(dst_fd, view[written:n], offset + written)
+            offset += n
+    finally:
+        view.release()
+        buffer.close()
+    return offset
+
+
+def _copy_methods(offset: int):
+    # A reflink clones the whole file, so it only applies to a fresh copy.
+    if offset == 0 and sys.platform.startswith('linux'):
+        yield 'reflink', lambda s, d, o, n: _reflink(s, d, n)
+    if hasattr(os, 'copy_file_range'):
+        yield 'copy_file_range', _copy_file_range
+    if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        yield 'sendfile', _sendfile
+    yield 'chunked', _chunked
+
+
+def _discard_partial(partial_path: str):
+    # The partial copy cannot be resumed: remove it and its marker from the destination folder.
+    for path in (partial_path, partial_path + ".json"):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def _resume_offset(src_fd: int, partial_path: str, marker: dict) -> int:
+    try:
+        with open(partial_path + ".json") as f:
+            saved = json.load(f)
+        partial_size = os.path.getsize(partial_path)
+    except (OSError, ValueError):
+        return 0
+    if saved.get('source') != marker or partial_size > marker['size']:
+        return 0
+    with open(partial_path, 'rb') as partial:
+        if _window_checksum(partial.fileno(), partial_size) != _window_checksum(src_fd, partial_size):
+            return 0
+    return partial_size
+
+
+def copy_file(src: str, dst: str, verify_checksum: bool = COPY_VERIFY_CHECKSUM) -> CopyResult:
+    """
+    Copy one file as fast as the filesystems allow, resuming an interrupted copy.
+
+    The data goes to ``dst + ".partial"`` and is renamed to ``dst`` once its
+    size (and optionally checksum) matches the source. A partial copy left by
+    an earlier run is continued if the source is unchanged and the bytes right
+    before the resume point match. A copy that cannot be resumed (no method
+    works, wrong size or checksum) is removed before shutil.Error is raised.
+
+    Example call:
+    copy_file("/data/Downloads/video.mkv", "/mnt/archive/Media/video.mkv")
+
+    Returns:
+        CopyResult: Bytes copied, time taken and the method that worked
+    """
+    partial_path = dst + PARTIAL_SUFFIX
+    start = time.perf_counter()
+    with open(src, 'rb') as src_file:
+        st = os.fstat(src_file.fileno())
+        marker = {'path': os.path.abspath(src), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        resumed_from = _resume_offset(src_file.fileno(), partial_path, marker)
+        with open(partial_path + ".json", 'w') as f:
+            json.dump({'source': marker}, f)
+
+        with open(partial_path, 'r+b' if resumed_from else 'wb') as dst_file:
+            src_fd, dst_fd = src_file.fileno(), dst_file.fileno()
+            with span("organizer.copy", cat="file", file=os.path.basename(src), bytes=st.st_size):
+                for method, copy in _copy_methods(resumed_from):
+                    try:
+                        copied_to = copy(src_fd, dst_fd, resumed_from, st.st_size)
+                        break
+                    except OSError as e:
+                        if e.errno not in _UNSUPPORTED:
+                            raise
+                        # A method that gave up midway may have written part of the file.
+                        os.ftruncate(dst_fd, resumed_from)
+                else:
+                    _discard_partial(partial_path)
+                    raise shutil.Error(f"No copy method could copy {src} to {partial_path}")
+            dst_file.truncate(copied_to)
+
+    if copied_to != st.st_size or os.path.getsize(partial_path) != st.st_size:
+        _discard_partial(partial_path)
+        raise shutil.Error(f"Copy of {src} is {copied_to} bytes, expected {st.st_size}")
+    if verify_checksum and file_checksum(src) != file_checksum(partial_path):
+        _discard_partial(partial_path)
+        raise shutil.Error(f"Copy of {src} does not match its checksum")
+
+    shutil.copystat(src, partial_path)
+    os.replace(partial_path, dst)
+    os.unlink(partial_path + ".json")
+    result = CopyResult(src, dst, st.st_size - resumed_from, time.perf_counter() - start, method, resumed_from)
+    logger.info(f"Copied {os.path.basename(src)} ({st.st_size / (1024 * 1024):.1f} MB) at "
+                f"{result.mb_per_s:.1f} MB/s via {method}" + (f", resumed at {resumed_from} bytes" if resumed_from else ""))
+    return result
+
+
+def move_file(src: str, dest_dir: str, verify_checksum: bool = COPY_VERIFY_CHECKSUM) -> CopyResult:
+    """
+    Move a file into another directory, across filesystems: copy_file, then delete the source.
+
+    Raises shutil.Error like shutil.move if the destination already exists.
+
+    Example call:
+    move_file("/data/Downloads/video.mkv", "/mnt/archive/Media")
+    """
+    dst = os.path.join(dest_dir, os.path.basename(src))
+    if os.path.exists(dst):
+        raise shutil.Error(f"Destination path '{dst}' already exists")
+    result = copy_file(src, dst, verify_checksum)
+    os.unlink(src)
+    return result
@@ -0,0 +1,227 @@
+import os
+import stat
+import shutil
+import logging
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.file_organizer.copy_engine import COPY_MAX_WORKERS, LARGE_FILE_BYTES, move_file, same_filesystem
+from src.observability.tracing import span
+
+logger = logging.getLogger("move_plan")
+
+
+CATEGORY_MAP = {
+    # Document formats
+    'pdf': 'PDFs',
+    'doc': 'Documents', 'docx': 'Documents', 'odt': 'Documents',
+    'rtf': 'Documents', 'tex': 'Documents',
+
+    # Image formats
+    'jpg': 'Images', 'jpeg': 'Images', 'png': 'Images',
+    'gif': 'Images', 'bmp': 'Images', 'svg': 'Images',
+    'tiff': 'Images', 'webp': 'Images',
+
+    # Code formats
+    'py': 'Code Files', 'js': 'Code Files', 'java': 'Code Files',
+    'cpp': 'Code Files', 'c': 'Code Files', 'h': 'Code Files',
+    'html': 'Code Files', 'css': 'Code Files', 'php': 'Code Files',
+    'rb': 'Code Files', 'swift': 'Code Files', 'kt': 'Code Files',
+
+    # Data formats
+    'csv': 'Data', 'json': 'Data', 'xml': 'Data', 'yaml': 'Data',
+    'yml': 'Data', 'db': 'Data', 'sql': 'Data',
+
+    # Archive formats
+    'zip': 'Archives', 'tar': 'Archives', 'gz': 'Archives',
+    '7z': 'Archives', 'rar': 'Archives', 'xz': 'Archives',
+
+    # Spreadsheet formats
+    'xls': 'Spreadsheets', 'xlsx': 'Spreadsheets', 'ods': 'Spreadsheets',
+
+    # Text formats
+    'txt': 'Text Files', 'md': 'Text Files', 'log': 'Text Files',
+
+    # Media formats
+    'mp3': 'Media', 'mp4': 'Media', 'avi': 'Media', 'mov': 'Media',
+    'wav': 'Media', 'flac': 'Media', 'mkv': 'Media',
+
+    # Executable formats
+    'exe': 'Executables', 'msi': 'Executables', 'app': 'Executables',
+    'dmg': 'Executables'
+}
+
+# Compression tool -> extension of the file it is run on.
+COMPRESSION_EXTENSIONS = {
+    'compress_pdf': '.pdf',
+    'compress_image': '.png',
+}
+
+def classify(filename: str) -> str:
+    """Category of a file, from its extension."""
+    _, _, ext = filename.rpartition('.')
+    return CATEGORY_MAP.get(ext.lower(), 'Other')
+
+
+# Name of the folder the organizer moves files into.
+ORGANIZED_DIRNAME = "organized_data"
+
+
+def default_destination_root(source_dir: str) -> str:
+    return os.path.join(os.path.dirname(source_dir), ORGANIZED_DIRNAME)
+
+
+def _list_entries(source_dir: str, destination_root: str) -> List[str]:
+    # A destination root inside the source folder is not an entry to organize.
+    names = os.listdir(source_dir)
+    if os.path.dirname(os.path.abspath(destination_root)) == os.path.abspath(source_dir):
+        with contextlib.suppress(ValueError):
+            names.remove(os.path.basename(destination_root))
+    return names
+
+
+class MoveError(shutil.Error):
+    """Some entries of a move plan could not be moved; the others were."""
+
+    def __init__(self, source_dir: str, failed: Dict[str, str], dest_map: Dict[str, str]):
+        super().__init__(f"Couldn't move {len(failed)} entries of {source_dir}: "
+                         + "; ".join(f"{filename}: {error}" for filename, error in failed.items()))
+        self.failed = failed
+        self.dest_map = dest_map
+
+
+class MovePlan:
+    """
+    Where every entry of a folder goes, computed without touching the filesystem.
+
+    ``moves`` maps every entry to its category, in the directory listing order,
+    so ``dest_map`` and the compression candidates match what the organizer
+    has always produced.
+    """
+
+    def __init__(self, source_dir: str, destination_root: str, moves: Dict[str, str]):
+        self.source_dir = source_dir
+        self.destination_root = destination_root
+        self.moves = moves
+
+    def category_dir(self, category: str) -> str:
+        return os.path.join(self.destination_root, category)
+
+    @property
+    def dest_map(self) -> Dict[str, str]:
+        category_dirs = {category: self.category_dir(category) for category in set(self.moves.values())}
+        return {filename: os.path.join(category_dirs[category], filename) for filename, category in self.moves.items()}
+
+    def compression_candidate(self, tool: str) -> Optional[str]:
+        """Name of the first file a compression tool would run on, or None."""
+        extension = COMPRESSION_EXTENSIONS.get(tool)
+        return next((f for f in self.moves if extension and f.endswith(extension)), None)
+
+    def matches(self, source_dir: str, destination_root: Optional[str] = None) -> bool:
+        return self.source_dir == source_dir and self.destination_root == (
+            destination_root or default_destination_root(source_dir))
+
+    def revalidate(self) -> "MovePlan":
+        """
+        Plan for the folder as it is now, reusing the entries that are still there.
+
+        A move only depends on the file name, so the folder is listed again and
+        compared by name: entries that disappeared are dropped, new ones are
+        classified. Nothing is stat'ed.
+        """
+        with span("organizer.revalidate", cat="file", folder=self.source_dir):
+            moves = {filename: self.moves.get(filename)
+                     for filename in _list_entries(self.source_dir, self.destination_root)}
+            added = [filename for filename, category in moves.items() if category is None]
+            for filename in added:
+                moves[filename] = classify(filename)
+        # New entries, plus the planned ones that are gone.
+        stale = 2 * len(added) + len(self.moves) - len(moves)
+        if stale:
+            logger.info(f"{stale} entries of {self.source_dir} changed since planning, re-planned them")
+        return MovePlan(self.source_dir, self.destination_root, moves)
+
+
+def plan_moves(source_dir: str, destination_root: Optional[str] = None) -> MovePlan:
+    """
+    Scan and classify a folder, without creating or moving anything.
+
+    Example call:
+    plan_moves("/source/path")
+
+    Args:
+        source_dir (str): Directory containing original files
+        destination_root (str, optional): Base directory for categorized folders.
+            Defaults to an "organized_data" folder next to source_dir. When it is
+            inside source_dir, it is not planned as an entry.
+
+    Returns:
+        MovePlan: The move of every entry of source_dir
+    """
+    destination_root = destination_root or default_destination_root(source_dir)
+    with span("organizer.plan", cat="file", folder=source_dir):
+        moves = {filename: classify(filename) for filename in _list_entries(source_dir, destination_root)}
+    return MovePlan(source_dir, destination_root, moves)
+
+
+def _is_large_file(path: str, large_file_bytes: int) -> bool:
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    return stat.S_ISREG(st.st_mode) and st.st_size >= large_file_bytes
+
+
+def apply_move_plan(plan: MovePlan, large_file_bytes: int = LARGE_FILE_BYTES, strict: bool = False) -> Dict[str, str]:
+    """
+    Create the category directories and move every planned entry.
+
+    When the destination is on another filesystem, large files go through the
+    copy engine, several at a time, while the other entries are moved. Only
+    then are the entries stat'ed, for their size.
+
+    Example call:
+    apply_move_plan(plan_moves("/source/path"))
+
+    Args:
+        plan (MovePlan): The plan to apply
+        large_file_bytes (int, optional): Size from which a cross-filesystem move uses the copy engine
+        strict (bool, optional): Raise MoveError once every entry was tried, if some could not be moved
+
+    Returns:
+        Dict[str, str]: Filename to destination path, of the entries that were moved
+    """
+    os.makedirs(plan.destination_root, exist_ok=True)
+    category_dirs = {category: plan.category_dir(category) for category in set(plan.moves.values())}
+    for category_dir in category_dirs.values():
+        os.makedirs(category_dir, exist_ok=True)
+
+    cross_device = not same_filesystem(plan.source_dir, plan.destination_root)
+    large_copies, failed = {}, {}
+    with ThreadPoolExecutor(max_workers=COPY_MAX_WORKERS if cross_device else 1,
+                            thread_name_prefix="copy-engine") as pool:
+        for filename, category in plan.moves.items():
+            src_path = os.path.join(plan.source_dir, filename)
+            dest_dir = category_dirs[category]
+            if cross_device and _is_large_file(src_path, large_file_bytes):
+                large_copies[filename] = pool.submit(move_file, src_path, dest_dir)
+                continue
+            try:
+                with span("organizer.move", cat="file", file=filename, category=category):
+                    shutil.move(src_path, dest_dir)
+            except OSError as e:
+                logger.info(f"Couldn't move {filename}: {e}")
+                failed[filename] = str(e)
+
+        for filename, future in large_copies.items():
+            try:
+                future.result()
+            except OSError as e:
+                logger.info(f"Couldn't move {filename}: {e}")
+                failed[filename] = str(e)
+
+    dest_map = {filename: path for filename, path in plan.dest_map.items() if filename not in failed}
+    if failed and strict:
+        raise MoveError(plan.source_dir, failed, dest_map)
+    return dest_map
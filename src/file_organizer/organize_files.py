@@ -1,101 +1,38 @@
-import os
-import shutil
-from typing import Dict, List
+from typing import Dict, Optional
 import logging
+
+from src.file_organizer.move_plan import MovePlan, apply_move_plan, plan_moves
+
 __name__ = "__file_organizer__"
-logging.basicConfig(level = logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 def move_files_to_categories(source_dir: str, 
-                            destination_root: str = None) -> None:
+                            destination_root: str = None,
+                            plan: Optional[MovePlan] = None,
+                            strict: bool = False) -> Dict[str, str]:
     """
     Organize files into category-specific directories.
     
     Example call:
-    move_files_to_categories("/source/path", {"file.pdf": "PDFs"}, "/destination/path")
+    move_files_to_categories("/source/path", "/destination/path")
     
     Args:
         source_dir (str): Directory containing original files
-        file_category_mapping (Dict[str, str]): Filename to category mapping
         destination_root (str, optional): Base directory for categorized folders.
-            Defaults to source_dir if not provided.
+            Defaults to an "organized_data" folder next to source_dir.
+        plan (MovePlan, optional): Move plan computed ahead of time for source_dir.
+            It is revalidated against the folder before being applied.
+        strict (bool, optional): Raise MoveError if some files could not be moved,
+            instead of leaving them out of the result.
             
     Returns:
-        None
+        Dict[str, str]: Filename to destination path, of the files that were moved
     """
 
-    dest_map = {}
-
-    category_map = {
-        # Document formats
-        'pdf': 'PDFs',
-        'doc': 'Documents', 'docx': 'Documents', 'odt': 'Documents',
-        'rtf': 'Documents', 'tex': 'Documents',
-        
-        # Image formats
-        'jpg': 'Images', 'jpeg': 'Images', 'png': 'Images',
-        'gif': 'Images', 'bmp': 'Images', 'svg': 'Images',
-        'tiff': 'Images', 'webp': 'Images',
-        
-        # Code formats
-        'py': 'Code Files', 'js': 'Code Files', 'java': 'Code Files',
-        'cpp': 'Code Files', 'c': 'Code Files', 'h': 'Code Files',
-        'html': 'Code Files', 'css': 'Code Files', 'php': 'Code Files',
-        'rb': 'Code Files', 'swift': 'Code Files', 'kt': 'Code Files',
-        
-        # Data formats
-        'csv': 'Data', 'json': 'Data', 'xml': 'Data', 'yaml': 'Data',
-        'yml': 'Data', 'db': 'Data', 'sql': 'Data',
-        
-        # Archive formats
-        'zip': 'Archives', 'tar': 'Archives', 'gz': 'Archives',
-        '7z': 'Archives', 'rar': 'Archives', 'xz': 'Archives',
-        
-        # Spreadsheet formats
-        'xls': 'Spreadsheets', 'xlsx': 'Spreadsheets', 'ods': 'Spreadsheets',
-        
-        # Text formats
-        'txt': 'Text Files', 'md': 'Text Files', 'log': 'Text Files',
-        
-        # Media formats
-        'mp3': 'Media', 'mp4': 'Media', 'avi': 'Media', 'mov': 'Media',
-        'wav': 'Media', 'flac': 'Media', 'mkv': 'Media',
-        
-        # Executable formats
-        'exe': 'Executables', 'msi': 'Executables', 'app': 'Executables',
-        'dmg': 'Executables'
-    }
-
-    file_categories = {}
-    for filename in os.listdir(source_dir):
-        # Split filename and handle hidden/unix-style files
-        _, _, ext = filename.rpartition('.')
-        ext = ext.lower()
-        category = category_map.get(ext, 'Other')
-        file_categories[filename] = category
-
-    if not destination_root:
-        destination_root = os.path.join(os.path.dirname(source_dir), "organized_data")
-        os.makedirs(destination_root, exist_ok=True)
-
-    # Create all category directories first
-    categories = set(file_categories.values())
-    for category in categories:
-        os.makedirs(os.path.join(destination_root, category), exist_ok=True)
-
-    # Move files to their categories
-    for filename, category in file_categories.items():
-        src_path = os.path.join(source_dir, filename)
-        dest_dir = os.path.join(destination_root, category)
-
-        dest_map[filename] = os.path.join(dest_dir, filename)
-        
-        try:
-            shutil.move(src_path, dest_dir)
-        except shutil.Error as e:
-            print(f"Couldn't move {filename}: {str(e)}")
-        except FileNotFoundError:
-            print(f"Source file not found: {filename}")
+    if plan is not None and plan.matches(source_dir, destination_root):
+        plan = plan.revalidate()
+    else:
+        plan = plan_moves(source_dir, destination_root)
 
-    return dest_map
+    return apply_move_plan(plan, strict=strict)
@@ -2,7 +2,6 @@ import os
 from typing import Dict, List
 import logging
 __name__ = "__folder_scanner__"
-logging.basicConfig(level = logging.INFO)
 logger = logging.getLogger(__name__)
 
 def scan_folder(directory: str) -> List[str]:
@@ -0,0 +1,255 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Protocol, Union
+
+from dotenv import load_dotenv
+
+from src.llm_engine.resilience import DEFAULT_POLICY, policy_for_stage
+
+load_dotenv()
+
+
+#---------------------
+# Model selection
+#---------------------
+
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "gemini-2.0-flash-exp")
+FAST_MODEL = os.getenv("LLM_FAST_MODEL", "gemini-2.0-flash-lite")
+
+# Cheap, short-answer stages run on the fast model, planning stages on the default one.
+# Each stage can be overridden with LLM_MODEL_<STAGE>, e.g. LLM_MODEL_DECOMPOSE.
+STAGE_MODELS = {
+    'task_identifier': FAST_MODEL,
+    'decompose': DEFAULT_MODEL,
+    'tool_selection': DEFAULT_MODEL,
+    'sequence_validator': DEFAULT_MODEL,
+    'json_validator': FAST_MODEL,
+}
+
+
+def model_for_stage(stage: Optional[str]) -> str:
+    """
+    Model used for a pipeline stage.
+
+    Example call:
+    model_for_stage("json_validator")
+    """
+    if stage is None:
+        return DEFAULT_MODEL
+    return os.getenv(f"LLM_MODEL_{stage.upper()}", STAGE_MODELS.get(stage, DEFAULT_MODEL))
+
+
+class LLMBackend(Protocol):
+    """
+    What an Agent needs from a model provider.
+
+    Calls are stateless: every prompt is sent with its system prompt and no
+    chat history. ``generate_batch`` answers several independent prompts
+    sharing one system prompt, in prompt order.
+    """
+
+    def generate(self, system_prompt: Optional[str], prompt: str, model: str,
+                 stage: Optional[str] = None) -> str:
+        ...
+
+    def generate_batch(self, system_prompt: Optional[str], prompts: List[str], model: str,
+                       stage: Optional[str] = None) -> List[str]:
+        ...
+
+
+#---------------------
+# Gemini
+#---------------------
+
+def _timeout_ms(seconds: float) -> int:
+    return max(1, int(seconds * 1000))
+
+
+class GeminiBackend:
+    """Google Gemini through the google-genai client, created on first use."""
+
+    # Gemini has no synchronous multi-prompt call, so a batch is sent concurrently.
+    max_batch_workers = 8
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or os.getenv("API_KEY")
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from google import genai
+                from google.genai import types
+                self._client = genai.Client(
+                    api_key=self.api_key,
+                    http_options=types.HttpOptions(timeout=_timeout_ms(DEFAULT_POLICY.deadline_s))
+                )
+            return self._client
+
+    def generate(self, system_prompt, prompt, model, stage=None):
+        from google.genai import types
+
+        # The HTTP request ends at the stage deadline, so an attempt abandoned by
+        # call_with_policy does not keep its worker thread forever.
+        response = self.client.models.generate_content(
+            model=model,
+            contents=[prompt],
+            config=types.GenerateContentConfig(
+                system_instruction=system_prompt,
+                temperature=0.0,
+                http_options=types.HttpOptions(timeout=_timeout_ms(policy_for_stage(stage).deadline_s))
+            )
+        )
+        return response.text
+
+    def generate_batch(self, system_prompt, prompts, model, stage=None):
+        if len(prompts) <= 1:
+            return [self.generate(system_prompt, prompt, model, stage) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=min(len(prompts), self.max_batch_workers)) as pool:
+            return list(pool.map(lambda prompt: self.generate(system_prompt, prompt, model, stage), prompts))
+
+
+#---------------------
+# Local rules
+#---------------------
+
+# Tool order the plans are returned in, and the query keywords that select each tool.
+LOCAL_TOOL_RULES = [
+    ('move_files_to_categories', re.compile(r"organi[sz]e|sort|categor|arrange|manage|clean", re.I)),
+    ('compress_pdf', re.compile(r"pdf", re.I)),
+    ('compress_image', re.compile(r"image|png|jpe?g|photo|picture", re.I)),
+    ('process_todo_file', re.compile(r"to-?do|to_do|remind|invite|calendar|stock", re.I)),
+]
+COMPRESS_PATTERN = re.compile(r"compress|shrink|reduce", re.I)
+
+LOCAL_SUB_TASKS = {
+    'move_files_to_categories': "Organize the files of the folder into category sub-folders",
+    'compress_pdf': "Compress the PDF files",
+    'compress_image': "Compress the image files",
+    'process_todo_file': "Run the tasks listed in the to-do file",
+}
+
+
+class LocalRuleBackend:
+    """
+    Deterministic offline backend for tests and benchmarks.
+
+    Answers each stage of the planning pipeline from keyword rules on the
+    user query, or with a fixed ``plan`` of function names when one is given.
+    ``latency_s`` simulates model latency, either one value for every call
+    or a {model: seconds} mapping. ``stall_probability`` of the calls take
+    ``stall_s`` longer, to simulate a latency tail; the stalls follow ``seed``.
+    """
+
+    def __init__(self, plan: Optional[List[str]] = None, latency_s: Union[float, Dict[str, float]] = 0.0,
+                 stall_probability: float = 0.0, stall_s: float = 0.0, seed: int = 0):
+        self.plan = list(plan) if plan is not None else None
+        self.latency_s = latency_s
+        self.stall_probability = stall_probability
+        self.stall_s = stall_s
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.calls_by_model = {}
+        self._lock = threading.Lock()
+
+    def plan_for(self, text: str) -> List[str]:
+        if self.plan is not None:
+            return list(self.plan)
+        tools = [name for name, pattern in LOCAL_TOOL_RULES if pattern.search(text)]
+        if COMPRESS_PATTERN.search(text) and not {'compress_pdf', 'compress_image'} & set(tools):
+            tools += ['compress_pdf', 'compress_image']
+        return [name for name, _ in LOCAL_TOOL_RULES if name in tools]
+
+    @staticmethod
+    def _function_calls(functions):
+        return [{'step': str(i + 1), 'function': name} for i, name in enumerate(functions)]
+
+    @staticmethod
+    def _json_part(text):
+        start = min((i for i in (text.find("["), text.find("{")) if i != -1), default=-1)
+        if start == -1:
+            return None
+        try:
+            return json.JSONDecoder().raw_decode(text[start:])[0]
+        except json.JSONDecodeError:
+            return None
+
+    def generate(self, system_prompt, prompt, model, stage=None):
+        with self._lock:
+            self.calls += 1
+            self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+            stalled = self.stall_probability and self._rng.random() < self.stall_probability
+        latency = self.latency_s.get(model, 0.0) if isinstance(self.latency_s, dict) else self.latency_s
+        if stalled:
+            latency += self.stall_s
+        if latency:
+            time.sleep(latency)
+
+        if stage == 'task_identifier':
+            return "1" if self.plan_for(prompt) else "0"
+
+        if stage == 'decompose':
+            return json.dumps({'task': prompt, 'sub_tasks': [LOCAL_SUB_TASKS[name] for name in self.plan_for(prompt)]})
+
+        if stage == 'tool_selection':
+            steps = self._json_part(prompt)
+            text = " ".join(steps.get('sub_tasks', [])) if isinstance(steps, dict) else prompt
+            return "```json\n" + json.dumps(self._function_calls(self.plan_for(text))) + "\n```"
+
+        if stage in ('sequence_validator', 'json_validator'):
+            calls = self._json_part(prompt)
+            if isinstance(calls, dict):
+                calls = calls.get('function_calls', [])
+            order = [name for name, _ in LOCAL_TOOL_RULES]
+            functions = sorted((c['function'] for c in calls or []),
+                               key=lambda name: order.index(name) if name in order else len(order))
+            if stage == 'sequence_validator':
+                return "'function_calls': " + json.dumps(self._function_calls(functions))
+            return "```json\n" + json.dumps({'function_calls': self._function_calls(functions)}) + "\n```"
+
+        return ""
+
+    def generate_batch(self, system_prompt, prompts, model, stage=None):
+        return [self.generate(system_prompt, prompt, model, stage) for prompt in prompts]
+
+
+#---------------------
+# Backend registry
+#---------------------
+
+BACKENDS = {
+    'gemini': GeminiBackend,
+    'local': LocalRuleBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> LLMBackend:
+    """
+    Process-wide backend, chosen with LLM_BACKEND ("gemini" by default, or "local").
+
+    Example call:
+    get_backend().generate("You are a JSON Validator", "{}", model_for_stage("json_validator"))
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = BACKENDS[os.getenv("LLM_BACKEND", "gemini").lower()]()
+        return _backend
+
+
+def set_backend(backend: Optional[LLMBackend]) -> Optional[LLMBackend]:
+    """Replace the process-wide backend, returning the previous one. None resets to LLM_BACKEND."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+        return previous
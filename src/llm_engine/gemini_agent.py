@@ -1,44 +1,56 @@
 import warnings
-import os
-import json
-
-from google import genai
-from tqdm import tqdm
-from dotenv import load_dotenv
-from google import generativeai
-from google.genai import types
-from google.generativeai.types import GenerationConfig #GenerateContentConfig
-warnings.filterwarnings("ignore")
 
-load_dotenv()
+from typing import List, Optional
 
+from src.llm_engine.backends import LLMBackend, get_backend, model_for_stage
+from src.llm_engine.resilience import call_with_policy
+from src.observability.tracing import span
+warnings.filterwarnings("ignore")
 
-client = genai.Client(api_key=os.getenv("API_KEY"))
 
 class Agent:
 
-    def __init__(self, system_prompt=None):
-        self.model_name = "gemini-2.0-flash-exp"
+    def __init__(self, system_prompt=None, stage: Optional[str] = None,
+                 backend: Optional[LLMBackend] = None, model_name: Optional[str] = None):
+        """
+        Single-purpose LLM agent.
+
+        Example call:
+        agent = Agent(system_prompt="You are a JSON Validator", stage="json_validator")
+
+        Args:
+            system_prompt (str, optional): Instructions sent with every prompt
+            stage (str, optional): Pipeline stage, selects the model (see backends.STAGE_MODELS)
+            backend (LLMBackend, optional): Model provider. Defaults to the process-wide backend
+            model_name (str, optional): Explicit model, overriding the stage's model
+        """
+        self.stage = stage
+        self.model_name = model_name or model_for_stage(stage)
         self.system_prompt = system_prompt
-        self.client = client
-
-        # if os.path.exists(r"./metadata.json"):
-        #     system_prompt = json.load(open(r"./metadata.json", "r"))
-        #     self.system_prompt = system_prompt 
-
-        self.chat = self.client.chats.create(  model=self.model_name,
-                                              
-                                                config=types.GenerateContentConfig(system_instruction=self.system_prompt,
-                                                                                   temperature=0.0,)
-                                            )
-   
+        self.backend = backend or get_backend()
 
     def perform_action(self, user_query):
-
-        # response = self.client.models.generate_content(model=self.model_name,
-        #                                                #config=types.GenerateContentConfig(system_instruction=self.system_prompt),
-        #                                                contents=[user_query])
-
-
-        response = self.chat.send_message(user_query)
-        return response.text    
\ No newline at end of file
+        """
+        Answer one query, within the stage deadline and with retries and hedging.
+
+        Raises:
+            LLMError: If the model could not answer, LLMTimeoutError if it ran out of time
+        """
+        with span("llm.call", cat="llm", model=self.model_name, stage=self.stage):
+            return call_with_policy(
+                lambda: self.backend.generate(self.system_prompt, user_query, self.model_name, stage=self.stage),
+                stage=self.stage
+            )
+
+    def perform_actions(self, user_queries: List[str]) -> List[str]:
+        """
+        Answer several independent queries in one batched backend submission.
+
+        Example call:
+        agent.perform_actions(["Organize my folder", "Compress my PDFs"])
+        """
+        with span("llm.batch", cat="llm", model=self.model_name, stage=self.stage, size=len(user_queries)):
+            return call_with_policy(
+                lambda: self.backend.generate_batch(self.system_prompt, list(user_queries), self.model_name, stage=self.stage),
+                stage=f"{self.stage}.batch"
+            )
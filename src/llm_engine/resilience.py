@@ -0,0 +1,187 @@
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, NamedTuple, Optional, TypeVar
+
+logger = logging.getLogger("llm_resilience")
+
+T = TypeVar("T")
+
+
+class LLMError(Exception):
+    """An LLM call failed for good: not retryable, or out of attempts."""
+
+
+class LLMTimeoutError(LLMError, TimeoutError):
+    """An LLM call did not answer within its stage deadline."""
+
+
+class CallPolicy(NamedTuple):
+    deadline_s: float = float(os.getenv("LLM_DEADLINE_S", "60"))
+    max_attempts: int = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+    base_delay_s: float = 0.5
+    max_delay_s: float = 8.0
+    hedge: bool = os.getenv("LLM_HEDGE", "1").lower() not in ("0", "false", "no")
+    hedge_quantile: float = 0.95
+    # Hedging starts once a stage has this many latency samples.
+    min_samples: int = 20
+
+
+DEFAULT_POLICY = CallPolicy()
+
+# Short-answer stages get tighter deadlines than the planning stages.
+STAGE_POLICIES = {
+    'task_identifier': DEFAULT_POLICY._replace(deadline_s=min(20.0, DEFAULT_POLICY.deadline_s)),
+    'json_validator': DEFAULT_POLICY._replace(deadline_s=min(30.0, DEFAULT_POLICY.deadline_s)),
+}
+
+
+def policy_for_stage(stage: Optional[str]) -> CallPolicy:
+    return STAGE_POLICIES.get(stage, DEFAULT_POLICY)
+
+
+class LatencyHistogram:
+    """Latencies of the most recent successful calls of one stage."""
+
+    def __init__(self, size: int = 500):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+# Attempts run here so a stalled call can be abandoned at its deadline.
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_MAX_CONCURRENCY", "16")),
+                               thread_name_prefix="llm-call")
+
+
+def histogram_for_stage(stage: Optional[str]) -> LatencyHistogram:
+    with _histograms_lock:
+        return _histograms.setdefault(stage or "default", LatencyHistogram())
+
+
+def latency_report() -> Dict[str, Dict]:
+    """
+    p50/p95/p99 latency per stage, in seconds.
+
+    Example call:
+    latency_report()
+    """
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {
+        stage: {'count': len(h), 'p50_s': h.quantile(0.50), 'p95_s': h.quantile(0.95), 'p99_s': h.quantile(0.99)}
+        for stage, h in histograms.items()
+    }
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Timeouts, connection failures, rate limits and server-side errors are worth retrying."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    if isinstance(code, int):
+        return code in (408, 429) or code >= 500
+    # httpx, used by google-genai, raises TransportError subclasses for network failures.
+    return any(cls.__name__ in ("TransportError", "TimeoutException") for cls in type(exc).__mro__)
+
+
+def _timed(fn):
+    start = time.monotonic()
+    result = fn()
+    return result, time.monotonic() - start
+
+
+def _hedged_attempt(fn: Callable[[], T], histogram: LatencyHistogram, policy: CallPolicy, timeout: float) -> T:
+    deadline = time.monotonic() + timeout
+    futures = {_executor.submit(_timed, fn)}
+
+    hedge_after = histogram.quantile(policy.hedge_quantile) if policy.hedge and len(histogram) >= policy.min_samples else None
+    if hedge_after is not None and hedge_after < timeout:
+        done, _ = wait(futures, timeout=hedge_after, return_when=FIRST_COMPLETED)
+        if not done:
+            logger.debug(f"LLM call slower than its p{int(policy.hedge_quantile * 100)} ({hedge_after:.2f}s), hedging")
+            futures.add(_executor.submit(_timed, fn))
+
+    error = None
+    while futures:
+        done, futures = wait(futures, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            try:
+                result, seconds = future.result()
+            except Exception as e:
+                error = e
+                continue
+            histogram.record(seconds)
+            return result
+
+    if error is not None and not futures:
+        raise error
+    raise LLMTimeoutError(f"LLM call did not answer within {timeout:.1f}s")
+
+
+def call_with_policy(fn: Callable[[], T], stage: Optional[str] = None, policy: Optional[CallPolicy] = None) -> T:
+    """
+    Call ``fn`` within the stage deadline, retrying retryable errors and hedging slow attempts.
+
+    Retries back off exponentially with full jitter. When an attempt runs past
+    the stage's p95 latency, a duplicate is fired and the first answer wins.
+
+    Example call:
+    call_with_policy(lambda: backend.generate(system_prompt, prompt, model), stage="decompose")
+
+    Args:
+        fn (Callable): The call to make, without arguments
+        stage (str, optional): Pipeline stage, selects the policy and latency histogram
+        policy (CallPolicy, optional): Overrides the stage policy
+
+    Returns:
+        The result of ``fn``
+
+    Raises:
+        LLMTimeoutError: If no attempt answered before the deadline
+        LLMError: If the call failed with a non-retryable error or ran out of attempts
+    """
+    policy = policy or policy_for_stage(stage)
+    histogram = histogram_for_stage(stage)
+    deadline = time.monotonic() + policy.deadline_s
+
+    for attempt in range(policy.max_attempts):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            return _hedged_attempt(fn, histogram, policy, remaining)
+        except LLMTimeoutError:
+            raise
+        except Exception as e:
+            if not is_retryable(e) or attempt + 1 == policy.max_attempts:
+                raise LLMError(f"LLM call for stage '{stage}' failed: {e}") from e
+            delay = random.uniform(0, min(policy.max_delay_s, policy.base_delay_s * 2 ** attempt))
+            if time.monotonic() + delay >= deadline:
+                break
+            logger.info(f"LLM call for stage '{stage}' failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    raise LLMTimeoutError(f"LLM call for stage '{stage}' did not succeed within {policy.deadline_s:.0f}s")
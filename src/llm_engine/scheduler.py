@@ -1,9 +1,14 @@
 import os
+import glob
+import time
+import itertools
 import warnings
 import json
 import inspect
 
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pprint import pprint
 from dotenv import load_dotenv
 from tqdm import tqdm
@@ -12,19 +17,31 @@ from typing import List, Dict, Union, Optional
 from src.execute_to_do_tasks import run_to_do_tasks
 from src.file_compression import image_compression, pdf_compression
 from src.file_organizer import organize_files, validate_and_scan_folder
+from src.file_organizer.move_plan import COMPRESSION_EXTENSIONS, ORGANIZED_DIRNAME, plan_moves
 from src.llm_engine.gemini_agent import Agent  
 from src.llm_engine.llm_utilities import parse_llm_output
+from src.observability.log_config import configure_worker_logging
+from src.observability.tracing import discard_tracing, span
 
 
-logging.basicConfig(level = logging.INFO)
 logger = logging.getLogger("scheduler")
 
+# Tools that start from the organizer's dry run of the folder.
+PLAN_CONSUMERS = {'move_files_to_categories', 'compress_pdf', 'compress_image'}
+
+# Dry runs of the target folder, overlapped with the LLM planning chain.
+_speculation_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speculative-plan")
+
+# Worker processes executing one plan across many folders.
+SCHEDULER_FOLDER_WORKERS = int(os.getenv("SCHEDULER_FOLDER_WORKERS", str(os.cpu_count() or 1)))
+
 def accumulate_tools():
     total_tools = []
     for script in [organize_files, image_compression, pdf_compression, run_to_do_tasks]:
         functions = inspect.getmembers(script, inspect.isfunction)
-        # Extract function names
-        function_names = [(name,fn) for name, fn in functions if fn.__module__  == str(script.__name__)]
+        # Extract function names, private helpers are not exposed as tools
+        function_names = [(name,fn) for name, fn in functions
+                          if fn.__module__  == str(script.__name__) and not name.startswith("_")]
         total_tools.extend(function_names)
     
     available_tools = {k:fn for (k, fn) in total_tools}
@@ -45,7 +62,7 @@ def get_list_of_steps_to_perform_user_query(user_query):
 
         Don't start your answers with "Here is the JSON response", just give the JSON.
         """
-    problem_solver_agent = Agent(system_prompt=system_prompt)
+    problem_solver_agent = Agent(system_prompt=system_prompt, stage="decompose")
     
     llm_output = problem_solver_agent.perform_action(user_query)
 
@@ -64,7 +81,7 @@ def get_list_of_fn_calls_to_start_job(steps_from_llm, tool_descriptions, fn_orde
                 Don't give any arguments in your sequence of function calls.Just return one json file with function names and steps following the template below. 
                 [{'step': 'step_number', 'function': 'function_name'}].
                 """
-    task_identifier_agent = Agent(system_prompt=system_prompt + agent_job)
+    task_identifier_agent = Agent(system_prompt=system_prompt + agent_job, stage="tool_selection")
     response = task_identifier_agent.perform_action(steps_from_llm)
 
     return response
@@ -86,7 +103,7 @@ def function_call_validator(function_calls, fn_order):
                     "'function_calls': [{'step': 'step_number', 'function': 'function_name'}]".
                     """
     
-    validator_agent = Agent(system_prompt=system_prompt + agent_job)
+    validator_agent = Agent(system_prompt=system_prompt + agent_job, stage="sequence_validator")
     response = validator_agent.perform_action(function_calls)
 
     new_job= f"""Ensure that the below response is a valid JSON.
@@ -94,82 +111,296 @@ def function_call_validator(function_calls, fn_order):
                 
                 Do not say that "HERE is your JSON", return only the valid JSON
                 """
-    second_validator_agent = Agent(system_prompt="""You are a JSON Validator""")
+    second_validator_agent = Agent(system_prompt="""You are a JSON Validator""", stage="json_validator")
     final_response = second_validator_agent.perform_action(new_job)
 
     return final_response
 
 
-def scheduler(user_query, folder_path):
+def _speculative_plan(folder_path):
+    with span("planning.speculate", cat="planning", folder=folder_path):
+        return plan_moves(folder_path)
 
-    tools, desc = accumulate_tools()
+
+def _take_speculative_plan(speculation, functions):
+    """The dry run's plan if the LLM's plan uses it, otherwise discard it."""
+    if not PLAN_CONSUMERS & set(functions):
+        speculation.cancel()
+        logger.debug("Plan does not touch the folder, discarding the speculative dry run")
+        return None
+    try:
+        return speculation.result()
+    except OSError as e:
+        logger.info(f"Speculative dry run of the folder failed ({e}), planning after the LLM")
+        return None
+
+
+def _compression_target(tool, dest_map, move_plan, folder_path):
+    """Current path of the file a compression tool runs on: organized if the organizer ran, else in place."""
+    if dest_map is not None:
+        extension = COMPRESSION_EXTENSIONS[tool]
+        return next((path for file, path in dest_map.items() if file.endswith(extension)), None)
+    # The folder may have changed while the LLM was planning.
+    move_plan = move_plan.revalidate() if move_plan is not None else plan_moves(folder_path)
+    fname = move_plan.compression_candidate(tool)
+    return os.path.join(folder_path, fname) if fname else None
+
+
+def plan_function_calls(user_query, tools, desc):
+    """
+    Run the LLM planning chain for a query, without touching any folder.
+
+    Returns:
+        The validated [{'step': ..., 'function': ...}] list, or whatever the LLM
+        returned instead when it could not produce one
+    """
     fn_order = list(tools.keys())
     logger.info("Using the solver agent to break the problem into sub-problems\n")
-    llm_response = get_list_of_steps_to_perform_user_query(user_query)
-    function_calls = get_list_of_fn_calls_to_start_job(llm_response, desc, fn_order)
-    validated_function_calls = function_call_validator(function_calls=function_calls, fn_order=fn_order)
-    logger.info(validated_function_calls)
+    with span("planning.decompose", cat="planning"):
+        llm_response = get_list_of_steps_to_perform_user_query(user_query)
+    with span("planning.select_tools", cat="planning"):
+        function_calls = get_list_of_fn_calls_to_start_job(llm_response, desc, fn_order)
+    with span("planning.validate", cat="planning"):
+        validated_function_calls = function_call_validator(function_calls=function_calls, fn_order=fn_order)
+    logger.debug(validated_function_calls)
     dict_info = parse_llm_output(validated_function_calls)["function_calls"]
-    logger.info(dict_info)
-    if isinstance(dict_info, list):
-        logger.info("Started scheduling the sub-tasks and tools......")
-        logger.info("""
-                ░░░░
-                ░    ░
-            {○_○}   ░ Processing...
-            <|   |> ░
-            |   |  ░
-            ════   ░
-                ░░░░
-            """)
-        
-        for step in dict_info:
-            func = tools.get(step["function"])
-            logger.info(func)
-            if func is not None:
+    logger.debug(dict_info)
+    return dict_info
+
+
+def execute_plan(dict_info, folder_path, tools, move_plan=None, todo_updates=None, destination_root=None,
+                 strict=False):
+    """
+    Run the planned function calls on one folder.
+
+    When ``todo_updates`` is a list, to-do files are run without scheduling
+    their stock alerts or saving their cursors; those updates are appended to
+    the list instead, for the caller to commit (see scheduler_many).
+    ``destination_root`` is where the organizer moves files, by default next
+    to the folder. With ``strict``, files the organizer could not move raise
+    MoveError instead of being logged and skipped.
+
+    Returns:
+        List[str]: The functions that were run, in order
+    """
+    dest_map = None
+    executed = []
+    logger.info("Started scheduling the sub-tasks and tools......")
+    logger.debug("""
+            ░░░░
+            ░    ░
+        {○_○}   ░ Processing...
+        <|   |> ░
+        |   |  ░
+        ════   ░
+            ░░░░
+        """)
+
+    for step in dict_info:
+        func = tools.get(step["function"])
+        logger.debug(func)
+        if func is not None:
+            with span(f"tool.{step['function']}", cat="tool"):
                 if step["function"] == "move_files_to_categories":
-                    dest_map = func(source_dir=folder_path)
+                    dest_map = func(source_dir=folder_path, destination_root=destination_root, plan=move_plan,
+                                    strict=strict)
+                    executed.append(step["function"])
                     if dest_map:
                         logger.info("Successfully identified different categories of files and moved them to appropriate subfolders")
                         logger.info("Task Completed")
-                    
+                
                 elif step["function"] == "compress_pdf":
-                    logger.info("came here")
-                    fname = ""
-                    for file in dest_map:
-                        if file.endswith(".pdf"):
-                            fname = dest_map[file]
-                            break
-                    logger.info(fname)
-                    if fname != "":
+                    fname = _compression_target("compress_pdf", dest_map, move_plan, folder_path)
+                    logger.debug(fname)
+                    if fname:
                         func(file_path=fname)
+                        executed.append(step["function"])
                         logger.info("Successfully used online services to compress the input pdf and saved the results.")
                         logger.info("Task is completed successfully!!!")   
-                
+            
                 elif step["function"] == "compress_image":
-                    fname = ""
-                    for file in dest_map:
-                        if file.endswith(".png"):
-                            fname = dest_map[file]
-                            break
-                    if fname != "":
+                    fname = _compression_target("compress_image", dest_map, move_plan, folder_path)
+                    if fname:
                         func(file_path=fname)
+                        executed.append(step["function"])
                         logger.info("Successfully used online services to compress the input pdf and saved the results.")
                         logger.info("Task is completed successfully!!!")   
-                
+            
                 elif step["function"] == "process_todo_file":
-                    func(folder_path=folder_path)
-                
+                    if todo_updates is None:
+                        func(folder_path=folder_path)
+                    else:
+                        update = {}
+                        todo_updates.append(update)
+                        run_to_do_tasks._read_todo_file(folder_path, update)
+                    executed.append(step["function"])
+            
                 else:
                     logger.info("There is no such available tool. Sorry couldn't schedule sub-task!!!")
-                
 
+    return executed
+
+
+def scheduler(user_query, folder_path):
+    """
+    Plan a user query with the LLM and run it on a folder.
+
+    ``folder_path`` can also be a list of folders or a glob pattern, in which
+    case the query is planned once and run on every folder (see scheduler_many).
+    """
+    if _is_many_folders(folder_path):
+        return format_run_summary(scheduler_many(user_query, folder_path))
+
+    # The dry run has no side effects, so it starts before the LLM decides whether it is needed.
+    speculation = _speculation_executor.submit(_speculative_plan, folder_path)
+    tools, desc = accumulate_tools()
+    dict_info = plan_function_calls(user_query, tools, desc)
+    if isinstance(dict_info, list):
+        move_plan = _take_speculative_plan(speculation, [step.get("function") for step in dict_info])
+        execute_plan(dict_info, folder_path, tools, move_plan)
         return "The user-query is resolved and the sub-tasks are completed!!!"
-                     
 
     else:
+        speculation.cancel()
         return "LLM was unable to fetch the tools required to do your job. Sorry for the inconvenience"
-    
+
+
+#---------------------
+# Many folders
+#---------------------
+
+def _is_many_folders(folder_path):
+    if isinstance(folder_path, (list, tuple)):
+        return True
+    return glob.has_magic(folder_path) and not os.path.isdir(folder_path)
+
+
+def _literal_prefix(pattern):
+    parts = pattern.split(os.sep)
+    return os.sep.join(itertools.takewhile(lambda part: not glob.has_magic(part), parts)) or os.curdir
+
+
+def _is_organized_output(path, pattern):
+    # Folders the organizer created, matched by a pattern meant for the folders to organize.
+    return ORGANIZED_DIRNAME in os.path.relpath(path, _literal_prefix(pattern)).split(os.sep)
+
+
+def resolve_folders(folders):
+    """
+    Expand a folder, a glob pattern or a list of both into existing folders, in order and without duplicates.
+
+    Folders matched by a pattern that are, or are inside, an "organized_data"
+    folder are left out, since the organizer created them.
+
+    Example call:
+    resolve_folders("/data/customers/*/inbox")
+    """
+    if isinstance(folders, str):
+        folders = [folders]
+    resolved = {}
+    for pattern in folders:
+        if os.path.isdir(pattern):
+            matches = [pattern]
+        else:
+            matches = [path for path in sorted(glob.glob(pattern)) if not _is_organized_output(path, pattern)]
+        resolved.update((path, None) for path in matches if os.path.isdir(path))
+    return list(resolved)
+
+
+def _init_folder_worker():
+    configure_worker_logging()
+    discard_tracing()
+
+
+def _execute_in_folder(dict_info, folder_path):
+    # Workers never write to the job store or the to-do cursor file: the stock
+    # alerts and cursors they read are returned, and the parent commits them.
+    # Each folder is organized into its own organized_data folder, since the
+    # default one, next to the folder, is shared by every folder of a glob.
+    tools, _ = accumulate_tools()
+    todo_updates = []
+    start = time.perf_counter()
+    try:
+        executed = execute_plan(dict_info, folder_path, tools, todo_updates=todo_updates,
+                                destination_root=os.path.join(folder_path, ORGANIZED_DIRNAME), strict=True)
+        return {'folder': folder_path, 'ok': True, 'functions': executed, 'todo_updates': todo_updates,
+                'seconds': round(time.perf_counter() - start, 3)}
+    except Exception as e:
+        logger.info(f"Failed to run the plan on {folder_path}: {e}")
+        return {'folder': folder_path, 'ok': False, 'error': f"{type(e).__name__}: {e}",
+                'todo_updates': todo_updates, 'seconds': round(time.perf_counter() - start, 3)}
+
+
+def scheduler_many(user_query, folders, max_workers=None):
+    """
+    Plan a user query once with the LLM and run the plan on many folders, in a process pool.
+
+    Every folder is organized into its own ``<folder>/organized_data``. A
+    folder where some files could not be moved counts as failed.
+
+    Example call:
+    scheduler_many("Organize my files and compress the PDFs", "/data/customers/*")
+
+    Args:
+        user_query (str): The instruction, the same for every folder
+        folders (Union[str, List[str]]): Folders or glob patterns of folders
+        max_workers (int, optional): Worker processes. Defaults to SCHEDULER_FOLDER_WORKERS
+
+    Returns:
+        Dict: The plan, and per-folder results and failures
+    """
+    start = time.perf_counter()
+    folder_list = resolve_folders(folders)
+    summary = {'query': user_query, 'folders': len(folder_list), 'functions': None,
+               'succeeded': 0, 'failed': 0, 'results': []}
+    if not folder_list:
+        summary['error'] = "No folder matches the given paths"
+        return summary
+
+    tools, desc = accumulate_tools()
+    dict_info = plan_function_calls(user_query, tools, desc)
+    if not isinstance(dict_info, list):
+        summary['error'] = "LLM was unable to fetch the tools required to do your job"
+        return summary
+    summary['functions'] = [step.get("function") for step in dict_info]
+
+    # Fork, so workers do not re-run the entry point script on import.
+    context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+    results = {}
+    with span("scheduler.many", cat="session", folders=len(folder_list)):
+        with ProcessPoolExecutor(max_workers=min(len(folder_list), max_workers or SCHEDULER_FOLDER_WORKERS),
+                                 mp_context=context, initializer=_init_folder_worker) as pool:
+            futures = {pool.submit(_execute_in_folder, dict_info, folder): folder for folder in folder_list}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Folders"):
+                folder = futures[future]
+                try:
+                    results[folder] = future.result()
+                except Exception as e:
+                    # The worker process itself died.
+                    results[folder] = {'folder': folder, 'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+    summary['results'] = [results[folder] for folder in folder_list]
+    summary['succeeded'] = sum(result['ok'] for result in summary['results'])
+    summary['failed'] = len(folder_list) - summary['succeeded']
+
+    # Commands that already ran in a failed folder still advance its cursor.
+    todo_updates = [update for result in summary['results'] for update in result.pop('todo_updates', [])]
+    if todo_updates:
+        with span("scheduler.commit_todo", cat="session", files=len(todo_updates)):
+            run_to_do_tasks._commit_todo_updates(todo_updates)
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    return summary
+
+
+def format_run_summary(summary):
+    """One line for the plan and the totals, then one line per failed folder."""
+    if 'error' in summary:
+        return f"{summary['error']}. Sorry for the inconvenience"
+    lines = [f"Ran {' -> '.join(summary['functions']) or 'no tools'} on {summary['folders']} folders "
+             f"in {summary['seconds']:.1f}s: {summary['succeeded']} succeeded, {summary['failed']} failed"]
+    lines += [f"  {result['folder']}: {result['error']}" for result in summary['results'] if not result['ok']]
+    return "\n".join(lines)
+
 
 
 if __name__ == "__main__":
@@ -177,4 +408,3 @@ if __name__ == "__main__":
     folder_path = ""
     resp =scheduler(user_quer, folder_path)
     print(resp)
-
@@ -0,0 +1,54 @@
+import queue
+import atexit
+import logging
+import logging.handlers
+
+
+LOG_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+
+_listener = None
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Route all log records through a queue, formatted and written by a background thread.
+
+    Terminal I/O and the final formatting happen on the listener thread. The
+    caller still merges the message with its arguments (QueueHandler.prepare)
+    and enqueues the record. Call once, from the entry point.
+
+    Example call:
+    configure_logging(logging.INFO)
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    records = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = logging.handlers.QueueListener(records, console, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    root.setLevel(level)
+
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def configure_worker_logging(level: int = logging.INFO) -> None:
+    """
+    Write log records directly from a worker process.
+
+    A forked worker inherits the queue handler but not the listener thread,
+    so its records would never be written.
+
+    Example call:
+    ProcessPoolExecutor(initializer=configure_worker_logging)
+    """
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger()
+    root.handlers = [console]
+    root.setLevel(level)
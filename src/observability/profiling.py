@@ -0,0 +1,89 @@
+import io
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+import contextlib
+
+
+# Up to Python 3.11 a cProfile profiler only sees the thread that enabled it, so
+# every thread started during the block gets its own and they are merged. From
+# 3.12 cProfile is built on sys.monitoring, which sees every thread.
+_PROFILER_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+
+@contextlib.contextmanager
+def profiled(report_path: str, top: int = 30):
+    """
+    Run a block under cProfile and tracemalloc and write a text report.
+
+    The report lists the hottest functions by cumulative and by own time,
+    and the source lines holding the most memory at the end of the block.
+    Threads started inside the block (LLM calls, the speculative dry run,
+    large copies) are profiled too; threads already running when the block
+    starts are not, unless Python is 3.12 or newer.
+    The raw profile is also saved next to it as ``<report_path>.prof``
+    for tools such as snakeviz.
+
+    Example call:
+    with profiled("profile_report.txt"):
+        run_session()
+
+    Args:
+        report_path (str): Path of the text report
+        top (int, optional): Number of functions and allocation sites listed
+    """
+    tracemalloc.start(25)
+    profiler = cProfile.Profile()
+    thread_profilers = []
+
+    def profile_thread(*args):
+        # Called once, on the first event of a new thread: enabling a
+        # profiler replaces this hook for that thread.
+        thread_profiler = cProfile.Profile()
+        thread_profilers.append(thread_profiler)
+        thread_profiler.enable()
+
+    start = time.perf_counter()
+    if not _PROFILER_SEES_ALL_THREADS:
+        threading.setprofile(profile_thread)
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if not _PROFILER_SEES_ALL_THREADS:
+            threading.setprofile(None)
+        elapsed = time.perf_counter() - start
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        report = io.StringIO()
+        stats = pstats.Stats(profiler, *thread_profilers, stream=report)
+        stats.dump_stats(f"{report_path}.prof")
+        report.write(f"Wall time: {elapsed:.3f}s\n")
+        report.write(f"Traced memory: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n")
+        if _PROFILER_SEES_ALL_THREADS:
+            report.write("Threads profiled: all\n\n")
+        else:
+            report.write(f"Threads profiled: the calling thread, plus {len(thread_profilers)} started during the "
+                         f"run (threads already running before it are not covered)\n\n")
+
+        stats.strip_dirs()
+        for sort_key in ("cumulative", "tottime"):
+            report.write(f"=== Hot functions by {sort_key} time ===\n")
+            stats.sort_stats(sort_key).print_stats(top)
+
+        report.write(f"=== Top {top} allocation sites ===\n")
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        for stat in snapshot.statistics("lineno")[:top]:
+            report.write(f"{stat}\n")
+
+        with open(report_path, 'w') as f:
+            f.write(report.getvalue())
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import atexit
+import threading
+from typing import Optional
+
+
+# Upper bound on recorded spans, so tracing a huge folder cannot exhaust memory.
+TRACE_MAX_EVENTS = int(os.getenv("TRACE_MAX_EVENTS", "1000000"))
+
+
+class Tracer:
+    """
+    Collects spans as Chrome trace "complete" events.
+
+    Spans of the same thread nest by time, so the file opens directly in
+    chrome://tracing or https://ui.perfetto.dev as a flame chart.
+    """
+
+    def __init__(self, path: str, max_events: int = TRACE_MAX_EVENTS):
+        self.path = path
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+        self.origin_ns = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, cat: str, start_ns: int, end_ns: int, args: dict) -> None:
+        event = {
+            'name': name,
+            'cat': cat,
+            'ph': 'X',
+            'ts': (start_ns - self.origin_ns) / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': self.pid,
+            'tid': threading.get_ident(),
+        }
+        if args:
+            event['args'] = {k: str(v) for k, v in args.items()}
+        with self._lock:
+            if len(self.events) < self.max_events:
+                self.events.append(event)
+            else:
+                self.dropped += 1
+
+    def write(self) -> str:
+        with self._lock:
+            trace = {
+                'traceEvents': list(self.events),
+                'displayTimeUnit': 'ms',
+                'otherData': {'dropped_events': self.dropped},
+            }
+        with open(self.path, 'w') as f:
+            json.dump(trace, f)
+        return self.path
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start_ns')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.cat, self.start_ns, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+_tracer = None
+
+
+def span(name: str, cat: str = "agent", **args):
+    """
+    Time a block as a trace span. Does nothing unless tracing was started.
+
+    Example call:
+    with span("organizer.move", cat="file", file="report.pdf"):
+        shutil.move(src, dst)
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SPAN
+    return _Span(tracer, name, cat, args)
+
+
+def start_tracing(path: str) -> Tracer:
+    """
+    Start recording spans, to be written to ``path`` by stop_tracing() or at exit.
+
+    Example call:
+    start_tracing("trace.json")
+    """
+    global _tracer
+    _tracer = Tracer(path)
+    atexit.register(stop_tracing)
+    return _tracer
+
+
+def stop_tracing() -> Optional[str]:
+    """Stop recording and write the Chrome trace file. Returns its path, if tracing was on."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None:
+        return None
+    return tracer.write()
+
+
+def discard_tracing() -> None:
+    """
+    Stop recording without writing anything, in a forked worker process.
+
+    The worker inherits the parent's tracer but its spans never reach the
+    parent's trace file, and the worker must not overwrite that file.
+    """
+    global _tracer
+    _tracer = None
@@ -0,0 +1,37 @@
+"""
+benchmarks.compare on a real run_benchmarks report.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import os
+import sys
+import json
+import copy
+import subprocess
+
+from benchmarks.compare import compare
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _report(tmp_path):
+    # A subprocess, so the benchmarks' state files point at their own temporary directory.
+    output = tmp_path / "report.json"
+    subprocess.run([sys.executable, "-m", "benchmarks.run_benchmarks", "--only", "llm_tail,many_folders",
+                    "--llm-tail-calls", "20", "--many-folders", "2", "--output", str(output)],
+                   cwd=ROOT, check=True, timeout=300, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with open(output) as f:
+        return json.load(f)
+
+
+def test_report_compared_with_itself_has_no_regression(tmp_path):
+    report = _report(tmp_path)
+
+    assert compare(report, report, threshold=0.10) == []
+
+    slower = copy.deepcopy(report)
+    plan_once = next(result for result in slower['results'] if result.get('mode') == 'plan_once')
+    plan_once['seconds'] *= 2
+    assert [(benchmark, field) for benchmark, field, _ in compare(report, slower, threshold=0.10)] == \
+        [('many_folders', 'seconds')]
@@ -0,0 +1,41 @@
+"""
+Jobs persisted by one process fire once the entry point starts in another.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import os
+import sys
+import time
+import datetime
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCHEDULE_JOB = """
+import sys, datetime
+from src.execute_to_do_tasks.job_scheduler import get_scheduler, shutdown_scheduler
+get_scheduler().add_job("os:mkdir", "date", args=[sys.argv[1]], id="persisted-job",
+                        run_date=datetime.datetime.fromisoformat(sys.argv[2]))
+shutdown_scheduler()
+"""
+
+
+def test_job_persisted_in_one_process_fires_in_a_fresh_one(tmp_path):
+    env = dict(os.environ, SCHEDULER_DB_PATH=str(tmp_path / "jobs.sqlite"), TODO_STATE_PATH=str(tmp_path / "todo.json"))
+    marker = tmp_path / "fired"
+    run_date = datetime.datetime.now() + datetime.timedelta(seconds=1)
+    subprocess.run([sys.executable, "-c", SCHEDULE_JOB, str(marker), run_date.isoformat()],
+                   cwd=ROOT, env=env, check=True, timeout=60)
+    assert not marker.exists()
+
+    # The session waits for input, so the fresh process stays up until the job has had time to fire.
+    session = subprocess.Popen([sys.executable, "run_agentic_framework.py"], cwd=ROOT, env=env,
+                               stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while not marker.exists() and time.monotonic() < deadline:
+            time.sleep(0.1)
+    finally:
+        session.communicate(b"0\n", timeout=60)
+    assert marker.exists()
@@ -0,0 +1,108 @@
+"""
+QuoteService against the local stand-in quote provider.
+
+Run from the repository root:
+    python -m pytest -q tests
+"""
+import time
+import threading
+
+from benchmarks.fakes import FakeQuoteProvider
+from src.execute_to_do_tasks.stock_quotes import QuoteService
+
+
+class BlockingProvider(FakeQuoteProvider):
+    """Holds every call until ``release`` is set, so callers can pile up behind it."""
+
+    def __init__(self, error=None):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.error = error
+
+    def __call__(self, symbols):
+        self.entered.set()
+        assert self.release.wait(timeout=5)
+        if self.error is not None:
+            self.calls += 1
+            raise self.error
+        return super().__call__(symbols)
+
+
+def _run_threads(service, symbol_lists):
+    results = [None] * len(symbol_lists)
+
+    def worker(i, symbols):
+        results[i] = service.get_quotes(symbols)
+
+    threads = [threading.Thread(target=worker, args=(i, symbols)) for i, symbols in enumerate(symbol_lists)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_overlapping_requests_make_one_provider_call():
+    provider = BlockingProvider()
+    service = QuoteService(provider, ttl=60, batch_window=0)
+
+    first, first_result = _run_threads(service, [["NVDA", "AAPL", "MSFT"]])
+    assert provider.entered.wait(timeout=5)
+    overlapping = [["NVDA"], ["aapl", "MSFT"], ["MSFT", "NVDA"], ["AAPL"]] * 5
+    others, results = _run_threads(service, overlapping)
+    time.sleep(0.05)
+    provider.release.set()
+
+    for thread in first + others:
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    assert provider.calls == 1
+    assert set(first_result[0]) == {"NVDA", "AAPL", "MSFT"}
+    for symbols, result in zip(overlapping, results):
+        assert set(result) == {s.upper() for s in symbols}
+
+
+def test_requests_within_the_batch_window_share_one_provider_call():
+    provider = FakeQuoteProvider()
+    service = QuoteService(provider, ttl=60, batch_window=0.2)
+
+    threads, results = _run_threads(service, [[symbol] for symbol in ("NVDA", "AAPL", "MSFT", "AMZN", "GOOG")])
+    for thread in threads:
+        thread.join(timeout=5)
+    assert provider.calls == 1
+    assert [list(result) for result in results] == [["NVDA"], ["AAPL"], ["MSFT"], ["AMZN"], ["GOOG"]]
+
+
+def test_cache_hit_within_ttl_and_refetch_after():
+    provider = FakeQuoteProvider()
+    service = QuoteService(provider, ttl=0.2, batch_window=0)
+
+    quote = service.get_quote("NVDA")
+    assert service.get_quote("NVDA") == quote
+    assert provider.calls == 1
+
+    time.sleep(0.25)
+    assert service.get_quote("NVDA") == quote
+    assert provider.calls == 2
+
+
+def test_provider_error_resolves_waiters_without_quote():
+    provider = BlockingProvider(error=ConnectionError("quote API down"))
+    service = QuoteService(provider, ttl=60, batch_window=0)
+
+    first, first_result = _run_threads(service, [["NVDA", "AAPL"]])
+    assert provider.entered.wait(timeout=5)
+    waiters, results = _run_threads(service, [["NVDA"], ["AAPL"], ["NVDA", "AAPL"]])
+    time.sleep(0.05)
+    provider.release.set()
+
+    for thread in first + waiters:
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+    assert first_result == [{}]
+    assert results == [{}, {}, {}]
+    assert provider.calls == 1
+
+    # Nothing was cached, so the next request fetches again.
+    provider.error = None
+    assert service.get_quote("NVDA") is not None
+    assert provider.calls == 2